@@ -4,14 +4,22 @@ Weather Logger - Database Backup Script
 
 Backs up the SQLite database to S3-compatible storage (Backblaze B2 or AWS S3).
 """
+import hashlib
+import json
 import logging
 import os
+import sqlite3
 import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import boto3
+import zstandard
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
 # Add src to path
@@ -29,6 +37,18 @@ class BackupManager:
     Manages database backups to S3-compatible storage.
     """
 
+    # Maximum number of keys accepted by a single delete_objects request
+    DELETE_BATCH_SIZE = 1000
+
+    # Error codes returned by S3-compatible targets that lack delete_objects
+    BULK_DELETE_UNSUPPORTED = {'NotImplemented', 'MethodNotAllowed'}
+
+    # Compressed backups larger than this are spooled to disk instead of memory
+    SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+    # ID of the bucket lifecycle rule that expires daily backups
+    LIFECYCLE_RULE_ID = "weather-logger-daily-retention"
+
     def __init__(self, config: Config):
         """
         Initialize backup manager.
@@ -51,8 +71,26 @@ class BackupManager:
         self.monthly_retention = backup_config.get("monthly_retention", True)
         self.prefix = backup_config.get("prefix", "weather-backups/")
 
+        # Multipart upload tuning (parts are uploaded concurrently)
+        self.multipart_threshold_mb = backup_config.get("multipart_threshold_mb", 8)
+        self.multipart_chunksize_mb = backup_config.get("multipart_chunksize_mb", 16)
+        self.max_concurrency = backup_config.get("max_concurrency", 10)
+
+        # zstd compression level for uploaded backups
+        self.compression_level = backup_config.get("compression_level", 5)
+
+        # Local cache of the bucket listing used by cleanup (full re-list after TTL)
+        self.listing_cache_ttl_days = backup_config.get("listing_cache_ttl_days", 7)
+
+        # Enforce retention with a bucket lifecycle rule instead of client-side cleanup
+        self.lifecycle_retention = backup_config.get("lifecycle_retention", False)
+        self._lifecycle_configured = False
+
         # Database path
         self.db_path = config.get("database.path", "data/weather.db")
+        self.listing_cache_path = backup_config.get(
+            "listing_cache_path", str(Path(self.db_path).parent / "backup_cache.json")
+        )
 
         # Validate configuration
         if self.enabled:
@@ -67,15 +105,33 @@ class BackupManager:
             # Treat empty endpoint_url as None (use default AWS S3 endpoints)
             endpoint = self.endpoint_url if self.endpoint_url else None
 
+            # Size the connection pool so concurrent multipart parts never wait
+            # for a free connection, and back off adaptively when throttled
+            boto_config = BotoConfig(
+                max_pool_connections=max(20, self.max_concurrency),
+                retries={'max_attempts': 10, 'mode': 'adaptive'},
+                tcp_keepalive=True,
+                # Path-style addressing for S3-compatible endpoints such as B2
+                s3={'addressing_style': 'path'} if endpoint else None,
+            )
+
             self.s3_client = boto3.client(
                 's3',
                 endpoint_url=endpoint,
                 aws_access_key_id=self.access_key,
                 aws_secret_access_key=self.secret_key,
+                config=boto_config,
+            )
+            self._transfer_config = TransferConfig(
+                multipart_threshold=self.multipart_threshold_mb * 1024 * 1024,
+                multipart_chunksize=self.multipart_chunksize_mb * 1024 * 1024,
+                max_concurrency=self.max_concurrency,
+                use_threads=True,
             )
             logger.info(f"Backup manager initialized for bucket: {self.bucket_name}")
         else:
             self.s3_client = None
+            self._transfer_config = None
             logger.info("Backup manager initialized (backups disabled)")
 
     def create_backup(self) -> bool:
@@ -96,32 +152,65 @@ class BackupManager:
                 logger.error(f"Database file not found: {self.db_path}")
                 return False
 
-            # Generate backup filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"weather_{timestamp}.db"
+            # Generate backup filename with timestamp (one clock read so the
+            # filename and metadata agree)
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
+            backup_filename = f"weather_{timestamp}.db.zst"
             s3_key = f"{self.prefix}{backup_filename}"
 
             logger.info(f"Creating backup: {backup_filename}")
             logger.info(f"Database size: {db_file.stat().st_size / 1024:.1f} KB")
 
+            # Tag the backup so the lifecycle rule can expire daily backups
+            extra_args = {'Metadata': {
+                'backup-date': now.isoformat(),
+                'source': 'weather-logger',
+                'compression': 'zstd',
+            }}
+            if self.lifecycle_retention:
+                extra_args['Tagging'] = f"retention={self._retention_tag(now.strftime('%Y%m'))}"
+
             # Upload to S3
             start_time = time.time()
 
-            self.s3_client.upload_file(
-                str(db_file),
-                self.bucket_name,
-                s3_key,
-                ExtraArgs={'Metadata': {
-                    'backup-date': datetime.now().isoformat(),
-                    'source': 'weather-logger',
-                }}
-            )
+            with tempfile.TemporaryDirectory() as tmp_dir, \
+                    tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as compressed:
+                # Take a consistent snapshot so concurrent writes can't tear pages
+                snapshot_path = Path(tmp_dir) / "snapshot.db"
+                self._snapshot_database(str(snapshot_path))
+
+                # Skip the upload if nothing changed since the latest backup
+                fingerprint = self._fingerprint(str(snapshot_path))
+                if fingerprint == self._latest_backup_fingerprint(now):
+                    logger.info("Database unchanged since latest backup, skipping upload")
+                    return True
+                extra_args['Metadata']['fingerprint'] = fingerprint
+
+                # Stream-compress the snapshot with zstd
+                compressor = zstandard.ZstdCompressor(level=self.compression_level)
+                with open(snapshot_path, 'rb') as src:
+                    compressor.copy_stream(src, compressed)
+
+                logger.info(f"Compressed size: {compressed.tell() / 1024:.1f} KB")
+                compressed.seek(0)
+
+                self.s3_client.upload_fileobj(
+                    compressed,
+                    self.bucket_name,
+                    s3_key,
+                    ExtraArgs=extra_args,
+                    Config=self._transfer_config,
+                )
 
             upload_time = time.time() - start_time
             logger.info(f"Backup uploaded successfully in {upload_time:.2f}s: s3://{self.bucket_name}/{s3_key}")
 
             # Clean up old backups
-            self.cleanup_old_backups()
+            if self.lifecycle_retention:
+                self.ensure_lifecycle_policy()
+            else:
+                self.cleanup_old_backups()
 
             return True
 
@@ -132,6 +221,133 @@ class BackupManager:
             logger.exception(f"Unexpected error during backup: {e}")
             return False
 
+    def _retention_tag(self, year_month: str) -> str:
+        """
+        Choose the retention tag for a new backup.
+
+        The first backup of each month is kept forever ("monthly"); all
+        others are expired by the lifecycle rule ("daily").
+
+        Args:
+            year_month: Backup month as YYYYMM
+
+        Returns:
+            Retention tag value
+        """
+        response = self.s3_client.list_objects_v2(
+            Bucket=self.bucket_name,
+            Prefix=f"{self.prefix}weather_{year_month}",
+            MaxKeys=1
+        )
+        return "daily" if response.get('KeyCount', 0) > 0 else "monthly"
+
+    def ensure_lifecycle_policy(self) -> bool:
+        """
+        Install the bucket lifecycle rule that expires daily backups.
+
+        Objects tagged retention=daily under the backup prefix expire after
+        daily_retention_days; monthly backups are never expired. Only done
+        once per process.
+
+        Note: this replaces the bucket's existing lifecycle configuration.
+
+        Returns:
+            True if the rule is in place, False otherwise
+        """
+        if self._lifecycle_configured:
+            return True
+
+        try:
+            self.s3_client.put_bucket_lifecycle_configuration(
+                Bucket=self.bucket_name,
+                LifecycleConfiguration={'Rules': [{
+                    'ID': self.LIFECYCLE_RULE_ID,
+                    'Status': 'Enabled',
+                    'Filter': {'And': {
+                        'Prefix': self.prefix,
+                        'Tags': [{'Key': 'retention', 'Value': 'daily'}],
+                    }},
+                    'Expiration': {'Days': self.daily_retention_days},
+                }]}
+            )
+            self._lifecycle_configured = True
+            logger.info(
+                f"Lifecycle rule installed: daily backups expire after "
+                f"{self.daily_retention_days} days"
+            )
+            return True
+
+        except ClientError as e:
+            logger.error(f"S3 error configuring lifecycle rule: {e}")
+            return False
+
+    def _fingerprint(self, path: str) -> str:
+        """
+        Compute a content fingerprint of a file.
+
+        Args:
+            path: File path
+
+        Returns:
+            Hex digest of the file contents
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _latest_backup_fingerprint(self, now: datetime):
+        """
+        Get the fingerprint stored on the most recent backup.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Fingerprint string, or None if unavailable
+        """
+        objects, listed_at = self._list_objects_cached(now)
+
+        # Tiered retention saves the listing after pruning; with lifecycle
+        # retention nothing else does, so save it here to keep the next
+        # listing incremental. Keys expired by the rule drop out at the next
+        # full listing (listing_cache_ttl_days).
+        if self.lifecycle_retention:
+            self._save_listing_cache(objects, listed_at)
+
+        if not objects:
+            return None
+
+        latest = max(objects, key=lambda obj: obj['LastModified'])
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=latest['Key'])
+        except ClientError as e:
+            logger.debug(f"Could not read metadata of latest backup {latest['Key']}: {e}")
+            return None
+
+        return head.get('Metadata', {}).get('fingerprint')
+
+    def _snapshot_database(self, snapshot_path: str) -> None:
+        """
+        Copy the live database to a snapshot file using SQLite's online backup API.
+
+        Unlike a plain file copy, this produces a consistent image even while
+        the collector is writing to the database.
+
+        Args:
+            snapshot_path: Destination path for the snapshot
+        """
+        src = sqlite3.connect(self.db_path)
+        try:
+            dst = sqlite3.connect(snapshot_path)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+
     def cleanup_old_backups(self) -> int:
         """
         Delete backups using tiered retention policy:
@@ -150,23 +366,24 @@ class BackupManager:
             logger.info(f"  - Monthly backups: one per month (forever)")
 
             # Calculate cutoff date for daily retention
-            daily_cutoff_date = datetime.now() - timedelta(days=self.daily_retention_days)
+            now = datetime.now()
+            daily_cutoff_date = now - timedelta(days=self.daily_retention_days)
 
-            # List objects in the bucket with our prefix
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=self.prefix
-            )
+            # List objects in the bucket with our prefix (incrementally via local cache)
+            objects, listed_at = self._list_objects_cached(now)
 
-            if 'Contents' not in response:
+            if not objects:
                 logger.info("No backups found in bucket")
                 return 0
 
             # Group backups by age category
             recent_backups = []  # Within daily retention period
-            old_backups = []  # Older than daily retention period
 
-            for obj in response['Contents']:
+            # Older backups are grouped by month, keyed by a single integer
+            # (year * 12 + month - 1) to avoid building a tuple per object
+            monthly_backups = {}
+
+            for obj in objects:
                 last_modified = obj['LastModified'].replace(tzinfo=None)
 
                 if last_modified >= daily_cutoff_date:
@@ -174,21 +391,11 @@ class BackupManager:
                     recent_backups.append(obj)
                 else:
                     # Old backup - apply monthly retention
-                    old_backups.append(obj)
-
-            # For old backups, keep only one per month (first backup of each month)
-            # Group by year-month
-            monthly_backups = {}
-            for obj in old_backups:
-                last_modified = obj['LastModified'].replace(tzinfo=None)
-                year_month = (last_modified.year, last_modified.month)
-
-                if year_month not in monthly_backups:
-                    monthly_backups[year_month] = []
-                monthly_backups[year_month].append(obj)
+                    year_month = last_modified.year * 12 + last_modified.month - 1
+                    monthly_backups.setdefault(year_month, []).append(obj)
 
             # Keep the first backup of each month, delete the rest
-            deleted_count = 0
+            to_delete = []
             for year_month, backups in monthly_backups.items():
                 # Sort by date
                 backups.sort(key=lambda x: x['LastModified'])
@@ -196,14 +403,20 @@ class BackupManager:
                 # Keep the first one, delete the rest
                 for obj in backups[1:]:
                     logger.info(f"Deleting redundant monthly backup: {obj['Key']} (from {obj['LastModified']})")
-                    self.s3_client.delete_object(
-                        Bucket=self.bucket_name,
-                        Key=obj['Key']
-                    )
-                    deleted_count += 1
+                    to_delete.append(obj['Key'])
 
                 if backups:
-                    logger.debug(f"Keeping monthly backup for {year_month[0]}-{year_month[1]:02d}: {backups[0]['Key']}")
+                    year, month_index = divmod(year_month, 12)
+                    logger.debug(f"Keeping monthly backup for {year}-{month_index + 1:02d}: {backups[0]['Key']}")
+
+            deleted_count = self._delete_keys(to_delete)
+
+            # Persist the listing minus the deleted keys for the next run
+            deleted_keys = set(to_delete)
+            self._save_listing_cache(
+                [obj for obj in objects if obj['Key'] not in deleted_keys],
+                listed_at
+            )
 
             if deleted_count > 0:
                 logger.info(f"Deleted {deleted_count} redundant backup(s)")
@@ -222,6 +435,200 @@ class BackupManager:
             logger.exception(f"Unexpected error during cleanup: {e}")
             return 0
 
+    def _list_objects(self, start_after: str = None) -> list:
+        """
+        List all objects under the backup prefix.
+
+        Walks every page of list_objects_v2 so results are not truncated
+        at 1000 objects.
+
+        Args:
+            start_after: Only list keys that sort after this key (optional)
+
+        Returns:
+            List of S3 object dictionaries
+        """
+        paginate_args = {
+            'Bucket': self.bucket_name,
+            'Prefix': self.prefix,
+            'PaginationConfig': {'PageSize': 1000},
+        }
+        if start_after:
+            paginate_args['StartAfter'] = start_after
+
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(**paginate_args)
+
+        objects = []
+        for page in pages:
+            objects.extend(page.get('Contents', []))
+
+        return objects
+
+    def _list_objects_cached(self, now: datetime) -> tuple:
+        """
+        List backup objects, reusing the local listing cache when it is fresh.
+
+        Backup keys embed their timestamp, so they sort chronologically; with a
+        fresh cache only keys after the newest cached key are fetched from S3.
+        A full listing is done when the cache is missing or older than
+        listing_cache_ttl_days.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Tuple of (list of S3 object dictionaries, time of last full listing)
+        """
+        cached = self._load_listing_cache(now)
+
+        if cached is None:
+            logger.debug("Listing cache missing or expired, doing full listing")
+            return self._list_objects(), now
+
+        objects, listed_at = cached
+        latest_key = max((obj['Key'] for obj in objects), default=None)
+        new_objects = self._list_objects(start_after=latest_key)
+        logger.debug(f"Listing cache hit: {len(objects)} cached, {len(new_objects)} new")
+
+        return objects + new_objects, listed_at
+
+    def _load_listing_cache(self, now: datetime):
+        """
+        Load the cached bucket listing from disk.
+
+        Args:
+            now: Current time, used to check the cache TTL
+
+        Returns:
+            Tuple of (objects, listed_at), or None if the cache is missing,
+            unreadable, for a different bucket/prefix, or expired
+        """
+        cache_file = Path(self.listing_cache_path)
+        if not cache_file.exists():
+            return None
+
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+
+            if cache.get('bucket') != self.bucket_name or cache.get('prefix') != self.prefix:
+                return None
+
+            listed_at = datetime.fromisoformat(cache['listed_at'])
+            if now - listed_at > timedelta(days=self.listing_cache_ttl_days):
+                return None
+
+            objects = [
+                {
+                    'Key': obj['key'],
+                    'Size': obj['size'],
+                    'LastModified': datetime.fromisoformat(obj['last_modified']),
+                }
+                for obj in cache['objects']
+            ]
+            return objects, listed_at
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable backup listing cache: {e}")
+            return None
+
+    def _save_listing_cache(self, objects: list, listed_at: datetime) -> None:
+        """
+        Save the bucket listing to the local cache file.
+
+        Args:
+            objects: List of S3 object dictionaries
+            listed_at: Time of the last full listing
+        """
+        cache = {
+            'bucket': self.bucket_name,
+            'prefix': self.prefix,
+            'listed_at': listed_at.isoformat(),
+            'objects': [
+                {
+                    'key': obj['Key'],
+                    'size': obj['Size'],
+                    'last_modified': obj['LastModified'].isoformat(),
+                }
+                for obj in objects
+            ],
+        }
+
+        try:
+            with open(self.listing_cache_path, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            logger.warning(f"Failed to write backup listing cache: {e}")
+
+    def _delete_keys(self, keys: list) -> int:
+        """
+        Delete objects from the bucket using the bulk delete API.
+
+        Keys are deleted in batches of up to 1000 (the delete_objects limit).
+        Targets without bulk delete support fall back to parallel
+        single-object deletes.
+
+        Args:
+            keys: S3 keys to delete
+
+        Returns:
+            Number of objects successfully deleted
+        """
+        deleted_count = 0
+
+        for i in range(0, len(keys), self.DELETE_BATCH_SIZE):
+            chunk = [{'Key': key} for key in keys[i:i + self.DELETE_BATCH_SIZE]]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': chunk, 'Quiet': True}
+                )
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in self.BULK_DELETE_UNSUPPORTED:
+                    raise
+
+                logger.warning("Bulk delete not supported by storage target, deleting individually")
+                return deleted_count + self._delete_keys_parallel(keys[i:])
+
+            errors = response.get('Errors', [])
+            for error in errors:
+                logger.error(f"Failed to delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+
+            deleted_count += len(chunk) - len(errors)
+
+        return deleted_count
+
+    def _delete_keys_parallel(self, keys: list) -> int:
+        """
+        Delete objects one at a time using a thread pool.
+
+        Args:
+            keys: S3 keys to delete
+
+        Returns:
+            Number of objects successfully deleted
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return sum(executor.map(self._delete_key, keys))
+
+    def _delete_key(self, key: str) -> bool:
+        """
+        Delete a single object from the bucket.
+
+        Args:
+            key: S3 key to delete
+
+        Returns:
+            True if deleted, False otherwise
+        """
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            logger.error(f"Failed to delete {key}: {e}")
+            return False
+
     def list_backups(self) -> list:
         """
         List all backups in the bucket.
@@ -233,16 +640,8 @@ class BackupManager:
             return []
 
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=self.prefix
-            )
-
-            if 'Contents' not in response:
-                return []
-
             backups = []
-            for obj in response['Contents']:
+            for obj in self._list_objects():
                 backups.append({
                     'key': obj['Key'],
                     'size': obj['Size'],
@@ -284,11 +683,25 @@ class BackupManager:
             logger.info(f"Restore destination: {restore_path}")
 
             # Download from S3
-            self.s3_client.download_file(
-                self.bucket_name,
-                backup_key,
-                restore_path
-            )
+            if backup_key.endswith(".zst"):
+                # Compressed backup - decompress while writing to destination
+                with tempfile.TemporaryFile() as compressed:
+                    self.s3_client.download_fileobj(
+                        self.bucket_name,
+                        backup_key,
+                        compressed
+                    )
+                    compressed.seek(0)
+
+                    with open(restore_path, 'wb') as dst:
+                        zstandard.ZstdDecompressor().copy_stream(compressed, dst)
+            else:
+                # Legacy uncompressed backup
+                self.s3_client.download_file(
+                    self.bucket_name,
+                    backup_key,
+                    restore_path
+                )
 
             logger.info(f"Backup restored successfully to {restore_path}")
             return True
@@ -318,7 +731,7 @@ def main():
     setup_logging(
         log_file=log_config["file"],
         log_level=log_config.get("level", "INFO"),
-        log_format=log_config["format"],
+        formatter=config.get_logging_formatter(),
     )
 
     logger.info("=" * 60)
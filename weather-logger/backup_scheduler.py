@@ -5,11 +5,17 @@ Weather Logger - Backup Scheduler
 Runs database backups on a schedule (cron-like).
 """
 import logging
+import re
 import signal
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+
+from croniter import croniter
+from dateutil import tz
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -21,12 +27,17 @@ from backup import BackupManager
 
 logger = logging.getLogger(__name__)
 
+# Plain daily schedule ("minute hour * * *"), handled without croniter
+_DAILY_SCHEDULE_RE = re.compile(r'^(\d+) (\d+) \* \* \*$')
+
 
 class BackupScheduler:
     """
     Schedules and executes database backups.
     """
 
+    DEFAULT_SCHEDULE = "0 2 * * *"  # Daily at 2am
+
     def __init__(self, config: Config):
         """
         Initialize backup scheduler.
@@ -38,57 +49,61 @@ class BackupScheduler:
         self.running = False
         self.backup_manager = BackupManager(config)
 
+        # Set by stop() to wake the scheduler from its wait immediately
+        self._wake = threading.Event()
+
         # Get backup schedule (cron format)
         backup_config = config.get("backup", {})
-        self.schedule = backup_config.get("schedule", "0 2 * * *")  # Daily at 2am
-
-        # Parse cron schedule to get hour and minute
-        self.backup_hour, self.backup_minute = self._parse_schedule(self.schedule)
+        self.schedule = backup_config.get("schedule", self.DEFAULT_SCHEDULE)
+
+        if not croniter.is_valid(self.schedule):
+            logger.warning(f"Invalid cron schedule: {self.schedule}, using default 2:00 AM")
+            self.schedule = self.DEFAULT_SCHEDULE
+
+        # Daily schedules use plain seconds-of-day arithmetic; anything else
+        # (steps, ranges, weekdays...) is evaluated by croniter
+        daily = _DAILY_SCHEDULE_RE.match(self.schedule)
+        if daily:
+            minute, hour = int(daily.group(1)), int(daily.group(2))
+            self._backup_seconds_of_day = hour * 3600 + minute * 60
+            self._cron = None
+            self.schedule_description = f"daily at {hour:02d}:{minute:02d}"
+        else:
+            self._backup_seconds_of_day = None
+            # Anchor croniter in local time (with DST rules); from a float it
+            # would read the cron fields as UTC
+            self._cron = croniter(self.schedule, datetime.now(tz.tzlocal()))
+            self.schedule_description = f"on cron schedule '{self.schedule}'"
 
         logger.info(f"Backup scheduler initialized")
-        logger.info(f"Backup schedule: Daily at {self.backup_hour:02d}:{self.backup_minute:02d}")
+        logger.info(f"Backup schedule: {self.schedule_description}")
 
-    def _parse_schedule(self, cron_string: str) -> tuple:
+    def _time_until_next_backup(self, now: Optional[float] = None) -> float:
         """
-        Parse simple cron schedule string.
-
-        Supports format: "minute hour * * *"
-        Example: "0 2 * * *" = 2:00 AM daily
+        Calculate seconds until next scheduled backup.
 
         Args:
-            cron_string: Cron schedule string
-
-        Returns:
-            Tuple of (hour, minute)
-        """
-        parts = cron_string.split()
-        if len(parts) < 2:
-            logger.warning(f"Invalid cron schedule: {cron_string}, using default 2:00 AM")
-            return (2, 0)
-
-        try:
-            minute = int(parts[0])
-            hour = int(parts[1])
-            return (hour, minute)
-        except ValueError:
-            logger.warning(f"Invalid cron schedule: {cron_string}, using default 2:00 AM")
-            return (2, 0)
-
-    def _time_until_next_backup(self) -> float:
-        """
-        Calculate seconds until next scheduled backup.
+            now: Current Unix time (optional, read from the clock if omitted)
 
         Returns:
             Seconds until next backup
         """
-        now = datetime.now()
-        target = now.replace(hour=self.backup_hour, minute=self.backup_minute, second=0, microsecond=0)
+        if now is None:
+            now = time.time()
+
+        if self._cron is not None:
+            self._cron.set_current(datetime.fromtimestamp(now, tz.tzlocal()))
+            return max(0.0, self._cron.get_next(float) - now)
+
+        local = time.localtime(now)
+        seconds_of_day = local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec + now % 1
+
+        time_until = self._backup_seconds_of_day - seconds_of_day
 
         # If target time has passed today, schedule for tomorrow
-        if target <= now:
-            target = target.replace(day=target.day + 1)
+        if time_until <= 0:
+            time_until += 86400
 
-        time_until = (target - now).total_seconds()
         return time_until
 
     def run(self):
@@ -105,7 +120,7 @@ class BackupScheduler:
 
         self.running = True
         logger.info("Backup scheduler started")
-        print(f"Backup scheduler running - backups at {self.backup_hour:02d}:{self.backup_minute:02d} daily")
+        print(f"Backup scheduler running - backups {self.schedule_description}")
 
         # Run initial backup if user wants
         # (commented out by default - uncomment to backup on startup)
@@ -114,25 +129,22 @@ class BackupScheduler:
 
         while self.running:
             try:
-                # Calculate time until next backup
-                seconds_until = self._time_until_next_backup()
-                next_backup_time = datetime.now().timestamp() + seconds_until
+                # Calculate time until next backup (one clock read per iteration)
+                now = time.time()
+                seconds_until = self._time_until_next_backup(now)
+                backup_at = datetime.fromtimestamp(now + seconds_until)
 
-                logger.info(f"Next backup in {seconds_until / 3600:.1f} hours "
-                           f"at {datetime.fromtimestamp(next_backup_time)}")
+                logger.info("Next backup in %.1f hours at %s", seconds_until / 3600, backup_at)
 
-                # Sleep in 1-minute intervals to allow graceful shutdown
-                while self.running and seconds_until > 0:
-                    sleep_time = min(60, seconds_until)  # Sleep max 1 minute at a time
-                    time.sleep(sleep_time)
-                    seconds_until -= sleep_time
+                # Sleep until the backup is due; stop() wakes us early
+                self._wake.wait(timeout=seconds_until)
 
                 if not self.running:
                     break
 
                 # Time for backup!
                 logger.info("Executing scheduled backup...")
-                print(f"\n[{datetime.now()}] Running scheduled backup...")
+                print(f"\n[{backup_at}] Running scheduled backup...")
 
                 success = self.backup_manager.create_backup()
 
@@ -148,13 +160,14 @@ class BackupScheduler:
                 break
             except Exception as e:
                 logger.exception(f"Unexpected error in scheduler loop: {e}")
-                time.sleep(60)  # Wait before retrying
+                self._wake.wait(timeout=60)  # Wait before retrying
 
         self.stop()
 
     def stop(self):
         """Stop the scheduler gracefully."""
         self.running = False
+        self._wake.set()
         logger.info("Backup scheduler stopped")
 
 
@@ -169,8 +182,8 @@ def setup_signal_handlers(scheduler: BackupScheduler):
         """Handle shutdown signals."""
         signal_name = signal.Signals(signum).name
         logger.info(f"Received {signal_name} signal")
+        # Wakes the scheduler loop, which then exits cleanly
         scheduler.stop()
-        sys.exit(0)
 
     # Handle SIGINT (Ctrl+C) and SIGTERM (Docker stop)
     signal.signal(signal.SIGINT, signal_handler)
@@ -194,7 +207,7 @@ def main():
     setup_logging(
         log_file=log_config["file"],
         log_level=log_config.get("level", "INFO"),
-        log_format=log_config["format"],
+        formatter=config.get_logging_formatter(),
     )
 
     logger.info("=" * 60)
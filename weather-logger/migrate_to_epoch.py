@@ -16,10 +16,9 @@ Usage:
 
 import argparse
 import logging
-import shutil
 import sqlite3
 import sys
-from datetime import datetime
+import time
 from pathlib import Path
 
 # Configure logging
@@ -29,6 +28,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Connection settings applied for the duration of the migration
+MIGRATION_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "cache_size=-262144",  # 256 MiB
+    "temp_store=MEMORY",
+    "mmap_size=268435456",  # 256 MiB
+)
+
+# Pacific-time DATETIME string -> UTC epoch seconds; unixepoch() (SQLite 3.38+)
+# returns an INTEGER directly, skipping the strftime string and CAST
+if sqlite3.sqlite_version_info >= (3, 38, 0):
+    EPOCH_EXPR = "unixepoch(timestamp, '+8 hours')"
+else:
+    EPOCH_EXPR = "CAST(strftime('%s', datetime(timestamp, '+8 hours')) AS INTEGER)"
+
+# Indexes a version 1 weather_measurements table may carry, dropped before the copy
+MEASUREMENT_INDEXES = ("idx_timestamp", "idx_mac_address", "idx_mac_timestamp")
+
 
 def get_schema_version(conn: sqlite3.Connection) -> int:
     """Get current schema version from database."""
@@ -48,11 +66,18 @@ def get_record_count(conn: sqlite3.Connection) -> int:
 
 def create_backup(db_path: str) -> str:
     """Create timestamped backup of database."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
     backup_path = f"{db_path}.backup_{timestamp}"
 
     logger.info(f"Creating backup: {backup_path}")
-    shutil.copy2(db_path, backup_path)
+    # Online backup API: a consistent page-level copy even with WAL or an active writer
+    src = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    dst = sqlite3.connect(backup_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
     logger.info(f"Backup created successfully")
 
     return backup_path
@@ -75,7 +100,8 @@ def migrate_to_epoch(db_path: str, dry_run: bool = False) -> bool:
 
     try:
         # Connect to database
-        conn = sqlite3.connect(db_path)
+        # Autocommit mode: the explicit BEGIN below is the only transaction boundary
+        conn = sqlite3.connect(db_path, isolation_level=None)
         conn.row_factory = sqlite3.Row
 
         # Check current schema version
@@ -88,20 +114,16 @@ def migrate_to_epoch(db_path: str, dry_run: bool = False) -> bool:
             conn.close()
             return False
 
-        # Get current record count
-        record_count = get_record_count(conn)
-        logger.info(f"Current record count: {record_count}")
-
         if dry_run:
+            record_count = get_record_count(conn)
+            logger.info(f"Current record count: {record_count}")
             logger.info("DRY RUN - Would perform the following:")
             logger.info(f"  1. Create backup of {db_path}")
-            logger.info(f"  2. Add temporary timestamp_epoch INTEGER column")
-            logger.info(f"  3. Convert {record_count} datetime strings to Unix epoch seconds")
-            logger.info(f"  4. Create new table with INTEGER timestamp column")
-            logger.info(f"  5. Copy all data to new table")
-            logger.info(f"  6. Drop old table and rename new table")
-            logger.info(f"  7. Recreate 3 indexes")
-            logger.info(f"  8. Update schema version to 2")
+            logger.info(f"  2. Create new table with INTEGER timestamp column")
+            logger.info(f"  3. Copy {record_count} records, converting datetime strings to Unix epoch seconds")
+            logger.info(f"  4. Drop old table and rename new table")
+            logger.info(f"  5. Recreate the device+time index")
+            logger.info(f"  6. Update schema version to 2")
             conn.close()
             return True
 
@@ -112,38 +134,23 @@ def migrate_to_epoch(db_path: str, dry_run: bool = False) -> bool:
         logger.info("Starting migration transaction...")
         cursor = conn.cursor()
 
+        # Bulk rewrite settings: fewer fsyncs and a large page cache
+        for pragma in MIGRATION_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+
         # Begin transaction explicitly
         cursor.execute("BEGIN TRANSACTION")
 
         try:
-            # Step 1: Add temporary epoch column
-            logger.info("Adding temporary timestamp_epoch column...")
-            cursor.execute("""
-                ALTER TABLE weather_measurements
-                ADD COLUMN timestamp_epoch INTEGER
-            """)
-
-            # Step 2: Convert all timestamps to Unix epoch seconds
-            # Note: Original timestamps are in local time (Pacific = UTC-8)
-            # Add 8 hours to convert Pacific time strings to UTC before converting to epoch
-            logger.info(f"Converting {record_count} timestamps to Unix epoch seconds (Pacific → UTC)...")
-            cursor.execute("""
-                UPDATE weather_measurements
-                SET timestamp_epoch = CAST(strftime('%s', datetime(timestamp, '+8 hours')) AS INTEGER)
-            """)
-
-            # Step 3: Verify no NULL values
-            cursor.execute("""
-                SELECT COUNT(*) as null_count
-                FROM weather_measurements
-                WHERE timestamp_epoch IS NULL
-            """)
-            null_count = cursor.fetchone()[0]
-            if null_count > 0:
-                raise Exception(f"Found {null_count} NULL epoch timestamps after conversion")
-            logger.info("All timestamps converted successfully (no NULLs)")
-
-            # Step 4: Create new table with INTEGER timestamp
+            # Drop the old table's indexes up front; the one still needed is rebuilt
+            # on the new table in Step 4, and they would only be dead weight during the copy
+            logger.info("Dropping old indexes...")
+            for index in MEASUREMENT_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+            # Step 1: Create new table with INTEGER timestamp
+            # Do not add indexes here: building them once over the loaded,
+            # sorted data (Step 4) is far cheaper than maintaining them per row
             logger.info("Creating new table with INTEGER timestamp...")
             cursor.execute("""
                 CREATE TABLE weather_measurements_new (
@@ -195,13 +202,15 @@ def migrate_to_epoch(db_path: str, dry_run: bool = False) -> bool:
                 )
             """)
 
-            # Step 5: Copy data using epoch timestamps
-            logger.info("Copying data to new table...")
-            cursor.execute("""
+            # Step 2: Copy data, converting timestamps to Unix epoch seconds in the same pass
+            # Note: Original timestamps are in local time (Pacific = UTC-8)
+            # Add 8 hours to convert Pacific time strings to UTC before converting to epoch
+            logger.info("Copying records with epoch timestamps (Pacific → UTC)...")
+            cursor.execute(f"""
                 INSERT INTO weather_measurements_new
                 SELECT
                     id,
-                    timestamp_epoch,
+                    {EPOCH_EXPR},
                     temp_outdoor, temp_indoor, feels_like, dew_point,
                     humidity_outdoor, humidity_indoor,
                     pressure_relative, pressure_absolute,
@@ -213,41 +222,50 @@ def migrate_to_epoch(db_path: str, dry_run: bool = False) -> bool:
                 FROM weather_measurements
                 ORDER BY id
             """)
+            # SQLite tracks rows written by the INSERT; no need to re-count the new table
+            new_count = cursor.rowcount
+
+            # Verify no NULL values
+            cursor.execute("""
+                SELECT COUNT(*) as null_count
+                FROM weather_measurements_new
+                WHERE timestamp IS NULL
+            """)
+            null_count = cursor.fetchone()[0]
+            if null_count > 0:
+                raise Exception(f"Found {null_count} NULL epoch timestamps after conversion")
+            logger.info("All timestamps converted successfully (no NULLs)")
 
             # Verify record count matches
-            cursor.execute("SELECT COUNT(*) FROM weather_measurements_new")
-            new_count = cursor.fetchone()[0]
+            record_count = get_record_count(conn)
             if new_count != record_count:
                 raise Exception(f"Record count mismatch: original={record_count}, new={new_count}")
             logger.info(f"Copied {new_count} records successfully")
 
-            # Step 6: Swap tables
+            # Step 3: Swap tables
             logger.info("Dropping old table and renaming new table...")
             cursor.execute("DROP TABLE weather_measurements")
             cursor.execute("ALTER TABLE weather_measurements_new RENAME TO weather_measurements")
 
-            # Step 7: Recreate indexes
-            logger.info("Recreating indexes...")
-            cursor.execute("""
-                CREATE INDEX idx_timestamp
-                ON weather_measurements(timestamp DESC)
-            """)
-            cursor.execute("""
-                CREATE INDEX idx_mac_address
-                ON weather_measurements(mac_address)
-            """)
+            # Step 4: Recreate index (the single-column ones were redundant with
+            # it and the UNIQUE constraint's index)
+            logger.info("Recreating index...")
             cursor.execute("""
                 CREATE INDEX idx_mac_timestamp
                 ON weather_measurements(mac_address, timestamp DESC)
             """)
 
-            # Step 8: Update schema version
+            # Step 5: Update schema version
             logger.info("Updating schema version to 2...")
             cursor.execute("INSERT INTO schema_version (version) VALUES (2)")
 
             # Commit transaction
             conn.commit()
             logger.info("Migration completed successfully!")
+
+            # The whole rewrite went through the WAL; fold it back and truncate it
+            # now rather than leaving a file the size of the table on disk
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
             logger.info(f"Backup saved at: {backup_path}")
 
             return True
@@ -8,9 +8,11 @@ Uses Socket.IO to receive data as soon as it's published by the weather station
 import logging
 import signal
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import List
 
 import socketio
 
@@ -40,6 +42,14 @@ class RealtimeWeatherCollector:
 
     REALTIME_URL = "https://rt2.ambientweather.net"
 
+    # Buffered measurements are written once this many have accumulated...
+    FLUSH_BATCH_SIZE = 32
+    # ...or once this many seconds have passed since the last flush
+    FLUSH_INTERVAL = 30.0
+
+    # Seconds between re-syncing the cached record count against the database
+    RECORD_COUNT_RESYNC_INTERVAL = 3600.0
+
     def __init__(self, config: Config):
         """
         Initialize the realtime weather collector.
@@ -50,6 +60,8 @@ class RealtimeWeatherCollector:
         self.config = config
         self.running = False
         self.mac_address = config.get("ambient_weather.mac_address")
+        # Normalized once for comparing against incoming data
+        self._mac_address_upper = self.mac_address.upper()
         self.api_key = config.get("ambient_weather.api_key")
         self.application_key = config.get("ambient_weather.application_key")
 
@@ -60,11 +72,30 @@ class RealtimeWeatherCollector:
         self.duplicate_count = 0
         self.error_count = 0
 
+        # Cached total record count for the device (kept in sync on insert)
+        self._record_count = None
+        self._record_count_synced = 0.0
+
+        # Write buffer for batching database inserts
+        self._write_buffer: List[WeatherMeasurement] = []
+        self._write_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        # Background flusher, so a quiet station doesn't leave rows buffered
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+
         # Initialize database
         db_path = config.get("database.path")
         self.database = WeatherDatabase(db_path)
         self.database.initialize_schema()
 
+        # Register the device name once; last_seen is refreshed on every flush
+        self.database.update_device_metadata(
+            mac_address=self.mac_address,
+            device_name="Oak",
+        )
+
         # Initialize Socket.IO client
         self.sio = socketio.Client(
             logger=False,
@@ -126,16 +157,16 @@ class RealtimeWeatherCollector:
             try:
                 # Data is the weather measurement itself
                 if not isinstance(data, dict):
-                    logger.warning(f"Unexpected data format: {type(data)}, value: {data}")
+                    logger.warning("Unexpected data format: %s, value: %s", type(data), data)
                     return
 
                 # Check if this is for our device
                 mac_in_data = data.get('macAddress', '')
-                if mac_in_data.upper() != self.mac_address.upper():
-                    logger.debug(f"Data for different device: {mac_in_data}")
+                if mac_in_data.upper() != self._mac_address_upper:
+                    logger.debug("Data for different device: %s", mac_in_data)
                     return
 
-                logger.info(f"Received realtime data update for {mac_in_data}")
+                logger.info("Received realtime data update for %s", mac_in_data)
 
                 # Parse and store the measurement
                 self._process_measurement(data)
@@ -147,7 +178,8 @@ class RealtimeWeatherCollector:
         @self.sio.on('*')
         def catch_all(event, data):
             """Catch all events for debugging."""
-            logger.debug(f"Received event '{event}': {data}")
+            # Lazy %-formatting: data is only stringified when DEBUG is enabled
+            logger.debug("Received event '%s': %s", event, data)
 
     def _process_measurement(self, data: dict):
         """
@@ -162,32 +194,14 @@ class RealtimeWeatherCollector:
 
             # Log the measurement
             logger.info(
-                f"Received realtime update: {measurement.timestamp}, "
-                f"temp={measurement.temp_outdoor}°F, "
-                f"humidity={measurement.humidity_outdoor}%"
+                "Received realtime update: %s, temp=%s°F, humidity=%s%%",
+                measurement.timestamp, measurement.temp_outdoor, measurement.humidity_outdoor
             )
 
-            # Insert into database
-            row_id = self.database.insert_measurement(measurement)
-
-            if row_id:
-                self.data_stored_count += 1
-                logger.info(
-                    f"Stored measurement in database (row ID: {row_id}) "
-                    f"[Total stored: {self.data_stored_count}]"
-                )
-
-                # Update device metadata
-                self.database.update_device_metadata(
-                    mac_address=self.mac_address,
-                    device_name="Oak",
-                )
-            else:
-                self.duplicate_count += 1
-                logger.debug(
-                    f"Duplicate measurement skipped "
-                    f"[Total duplicates: {self.duplicate_count}]"
-                )
+            # Buffer for a batched insert into the database
+            with self._write_lock:
+                self._write_buffer.append(measurement)
+                self._flush_if_due()
 
             # Log statistics every 10 updates
             if self.data_received_count % 10 == 0:
@@ -201,9 +215,90 @@ class RealtimeWeatherCollector:
             logger.exception(f"Unexpected error processing measurement: {e}")
             self.error_count += 1
 
+    def _flush_if_due(self):
+        """Flush the write buffer if it is full or the flush interval has elapsed."""
+        if (len(self._write_buffer) >= self.FLUSH_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+            self._flush_write_buffer()
+
+    def _flush_periodically(self):
+        """Flush the write buffer whenever FLUSH_INTERVAL passes without a flush."""
+        # Wake when the current interval runs out; a flush triggered by
+        # incoming data pushes the next wake-up back
+        while not self._stop_event.wait(self._last_flush + self.FLUSH_INTERVAL - time.monotonic()):
+            with self._write_lock:
+                try:
+                    self._flush_if_due()
+                except DatabaseError as e:
+                    logger.error(
+                        f"Database error flushing buffered measurements "
+                        f"({len(self._write_buffer)} kept for retry): {e}"
+                    )
+                    self.error_count += 1
+                except Exception as e:
+                    # Keep the timer alive; a dead flusher would strand buffered rows
+                    logger.exception(f"Unexpected error flushing buffered measurements: {e}")
+                    self.error_count += 1
+
+    def _flush_write_buffer(self):
+        """
+        Write all buffered measurements to the database in one transaction.
+
+        Must be called with the write lock held. If the insert fails the
+        measurements stay buffered and are retried on the next flush.
+
+        Raises:
+            DatabaseError: If the batch insert fails
+        """
+        self._last_flush = time.monotonic()
+
+        if not self._write_buffer:
+            return
+
+        batch = self._write_buffer
+        inserted = self.database.insert_measurements_batch(batch)
+        self._write_buffer = []
+
+        # One last_seen update per flushed batch rather than per measurement
+        self.database.update_device_metadata(mac_address=self.mac_address)
+
+        self.data_stored_count += inserted
+        if self._record_count is not None:
+            self._record_count += inserted
+        self.duplicate_count += len(batch) - inserted
+
+        if inserted:
+            logger.info(
+                "Stored %s measurement(s) in database [Total stored: %s]",
+                inserted, self.data_stored_count
+            )
+
+        if inserted < len(batch):
+            logger.debug(
+                "Duplicate measurement(s) skipped [Total duplicates: %s]",
+                self.duplicate_count
+            )
+
+    def _sync_record_count(self) -> int:
+        """
+        Refresh the cached record count from the database.
+
+        Returns:
+            Number of records stored for the device
+        """
+        self._record_count = self.database.get_record_count(self.mac_address)
+        self._record_count_synced = time.monotonic()
+        return self._record_count
+
     def _log_statistics(self):
         """Log collection statistics."""
-        total_records = self.database.get_record_count(self.mac_address)
+        # Use the in-memory count, re-syncing periodically to correct any drift
+        if (self._record_count is None
+                or time.monotonic() - self._record_count_synced >= self.RECORD_COUNT_RESYNC_INTERVAL):
+            self._sync_record_count()
+            # Refresh query planner statistics on the same cadence
+            self.database.optimize()
+        total_records = self._record_count
         logger.info(
             f"Statistics: Connections={self.connection_count}, "
             f"Received={self.data_received_count}, "
@@ -238,7 +333,7 @@ class RealtimeWeatherCollector:
         logger.info("Realtime weather collector service started")
 
         # Get initial record count
-        initial_count = self.database.get_record_count(self.mac_address)
+        initial_count = self._sync_record_count()
         logger.info(f"Starting with {initial_count} existing records")
 
         # Connect to realtime API
@@ -246,16 +341,25 @@ class RealtimeWeatherCollector:
             logger.error("Failed to establish initial connection")
             return
 
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, name="flush-timer", daemon=True
+        )
+        self._flush_thread.start()
+
         # Keep running until stopped
         try:
             while self.running:
-                if not self.sio.connected:
-                    logger.warning("Not connected, attempting to reconnect...")
+                # Block in the Socket.IO event loop; the client handles
+                # reconnection itself, so this only returns once the
+                # connection is closed for good (or stop() was called)
+                self.sio.wait()
+
+                if self.running:
+                    logger.warning("Connection closed, attempting to reconnect...")
                     time.sleep(5)
                     if self.running:
                         self.connect()
-                else:
-                    time.sleep(1)
 
         except KeyboardInterrupt:
             logger.info("Received interrupt signal, shutting down...")
@@ -269,6 +373,11 @@ class RealtimeWeatherCollector:
         self.running = False
         logger.info("Stopping realtime collector...")
 
+        # Stop the flush timer; the final flush below writes what is left
+        self._stop_event.set()
+        if self._flush_thread is not None and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join()
+
         # Disconnect from Socket.IO
         if self.sio.connected:
             try:
@@ -277,8 +386,20 @@ class RealtimeWeatherCollector:
             except Exception as e:
                 logger.warning(f"Error during disconnect: {e}")
 
+        # Write any buffered measurements
+        with self._write_lock:
+            try:
+                self._flush_write_buffer()
+            except DatabaseError as e:
+                logger.error(
+                    f"Database error flushing buffered measurements "
+                    f"({len(self._write_buffer)} not stored): {e}"
+                )
+                self.error_count += 1
+
         # Final statistics
         self._log_statistics()
+        self.database.close()
         logger.info("Realtime weather collector service stopped")
 
 
@@ -323,7 +444,7 @@ def main():
     setup_logging(
         log_file=log_config["file"],
         log_level=log_config["level"],
-        log_format=log_config["format"],
+        formatter=config.get_logging_formatter(),
     )
 
     logger.info("=" * 60)
@@ -6,12 +6,17 @@ import time
 from typing import Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .models import WeatherMeasurement
 
 
 logger = logging.getLogger(__name__)
 
+# The API allows one request per second per API key
+MIN_REQUEST_INTERVAL = 1.0
+
 
 class AmbientWeatherAPIError(Exception):
     """Base exception for Ambient Weather API errors."""
@@ -28,6 +33,14 @@ class AuthenticationError(AmbientWeatherAPIError):
     pass
 
 
+class _RateLimitedRetry(Retry):
+    """urllib3 Retry whose backoff never comes sooner than MIN_REQUEST_INTERVAL."""
+
+    def get_backoff_time(self) -> float:
+        # urllib3 retries the first failure immediately, below the client's rate limiter
+        return max(super().get_backoff_time(), MIN_REQUEST_INTERVAL)
+
+
 class AmbientWeatherClient:
     """
     Client for Ambient Weather API.
@@ -49,7 +62,25 @@ class AmbientWeatherClient:
         self.api_key = api_key
         self.application_key = application_key
         self.session = requests.Session()
-        self._last_request_time = 0.0
+        # Retry transient server errors on the same session, at most twice and
+        # never faster than the rate limit. 429 is left to RateLimitError.
+        # raise_on_status=False hands the final response back so status handling below still applies.
+        retry = _RateLimitedRetry(
+            total=2,
+            backoff_factor=1.0,
+            backoff_max=4.0,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # Single-host API: a small pool is enough
+        self.session.mount(
+            "https://", HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+        )
+        # Authentication is sent with every request; requests merges these into the query
+        self.session.params = {"applicationKey": application_key, "apiKey": api_key}
+        self._last_request_time = float("-inf")
 
         # Set default timeout for all requests
         self.timeout = 10
@@ -71,7 +102,7 @@ class AmbientWeatherClient:
         response = self._make_request(endpoint)
 
         devices = response if isinstance(response, list) else []
-        logger.info(f"Retrieved {len(devices)} device(s)")
+        logger.info("Retrieved %s device(s)", len(devices))
 
         return devices
 
@@ -92,7 +123,7 @@ class AmbientWeatherClient:
         Raises:
             AmbientWeatherAPIError: If API request fails
         """
-        logger.debug(f"Fetching data for device {mac_address}, limit={limit}")
+        logger.debug("Fetching data for device %s, limit=%s", mac_address, limit)
 
         endpoint = f"/devices/{mac_address}"
         params = {"limit": limit}
@@ -103,10 +134,28 @@ class AmbientWeatherClient:
         response = self._make_request(endpoint, params)
 
         data = response if isinstance(response, list) else []
-        logger.info(f"Retrieved {len(data)} record(s) for device {mac_address}")
+        logger.info("Retrieved %s record(s) for device %s", len(data), mac_address)
 
         return data
 
+    def get_recent_measurements(self, mac_address: str, limit: int = 288) -> List[WeatherMeasurement]:
+        """
+        Get recent weather measurements for a device.
+
+        Args:
+            mac_address: Device MAC address
+            limit: Number of records to retrieve (default 288, the API maximum)
+
+        Returns:
+            List of WeatherMeasurement instances, most recent first
+
+        Raises:
+            AmbientWeatherAPIError: If API request fails
+        """
+        data = self.get_device_data(mac_address, limit=limit)
+        from_api_response = WeatherMeasurement.from_api_response
+        return [from_api_response(record, mac_address) for record in data]
+
     def get_latest_measurement(self, mac_address: str) -> Optional[WeatherMeasurement]:
         """
         Get the latest weather measurement for a device.
@@ -120,13 +169,13 @@ class AmbientWeatherClient:
         Raises:
             AmbientWeatherAPIError: If API request fails
         """
-        data = self.get_device_data(mac_address, limit=1)
+        measurements = self.get_recent_measurements(mac_address, limit=1)
 
-        if not data:
-            logger.warning(f"No data available for device {mac_address}")
+        if not measurements:
+            logger.warning("No data available for device %s", mac_address)
             return None
 
-        return WeatherMeasurement.from_api_response(data[0], mac_address)
+        return measurements[0]
 
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
@@ -150,14 +199,7 @@ class AmbientWeatherClient:
         # Prepare request
         url = f"{self.BASE_URL}{endpoint}"
 
-        if params is None:
-            params = {}
-
-        # Add authentication parameters
-        params["applicationKey"] = self.application_key
-        params["apiKey"] = self.api_key
-
-        logger.debug(f"Making request to {endpoint}")
+        logger.debug("Making request to %s", endpoint)
 
         try:
             response = self.session.get(url, params=params, timeout=self.timeout)
@@ -172,41 +214,48 @@ class AmbientWeatherClient:
             elif response.status_code == 429:
                 raise RateLimitError("API rate limit exceeded. Please wait before retrying.")
             else:
-                error_msg = f"API request failed with status {response.status_code}"
-                try:
-                    error_detail = response.json()
-                    error_msg += f": {error_detail}"
-                except Exception:
-                    error_msg += f": {response.text}"
-
-                raise AmbientWeatherAPIError(error_msg)
+                raise AmbientWeatherAPIError(
+                    f"API request failed with status {response.status_code}: "
+                    f"{response.text[:512]}"
+                )
 
         except requests.Timeout:
-            logger.error(f"Request to {endpoint} timed out after {self.timeout}s")
+            logger.error("Request to %s timed out after %ss", endpoint, self.timeout)
             raise AmbientWeatherAPIError(f"Request timed out after {self.timeout}s")
 
         except requests.ConnectionError as e:
-            logger.error(f"Connection error while accessing {endpoint}: {e}")
+            logger.error("Connection error while accessing %s: %s", endpoint, e)
             raise AmbientWeatherAPIError(f"Connection error: {e}")
 
         except requests.RequestException as e:
-            logger.error(f"Request failed: {e}")
+            logger.error("Request failed: %s", e)
             raise AmbientWeatherAPIError(f"Request failed: {e}")
 
+        finally:
+            # Count from the end of the call: adapter retries may have sent
+            # further requests after the one the limiter let through
+            self._last_request_time = time.monotonic()
+
     def _enforce_rate_limit(self) -> None:
         """
         Enforce API rate limit of 1 request per second.
 
         Sleeps if necessary to ensure at least 1 second between requests.
         """
-        elapsed = time.time() - self._last_request_time
+        # Monotonic clock: unaffected by NTP adjustments to wall-clock time
+        now = time.monotonic()
+        wait = self._last_request_time + MIN_REQUEST_INTERVAL - now
+
+        if wait > 0:
+            logger.debug("Rate limiting: sleeping for %.3fs", wait)
+            time.sleep(wait)
+            now += wait
 
-        if elapsed < 1.0:
-            sleep_time = 1.0 - elapsed
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.3f}s")
-            time.sleep(sleep_time)
+        self._last_request_time = now
 
-        self._last_request_time = time.time()
+    def reset(self) -> None:
+        """Reset rate limiting state, keeping the existing HTTP session."""
+        self._last_request_time = float("-inf")
 
     def test_connection(self) -> bool:
         """
@@ -217,10 +266,10 @@ class AmbientWeatherClient:
         """
         try:
             devices = self.get_devices()
-            logger.info(f"Connection test successful. Found {len(devices)} device(s).")
+            logger.info("Connection test successful. Found %s device(s).", len(devices))
             return True
         except Exception as e:
-            logger.error(f"Connection test failed: {e}")
+            logger.error("Connection test failed: %s", e)
             return False
 
     def __repr__(self) -> str:
@@ -2,13 +2,45 @@
 Configuration management for Weather Logger.
 Supports loading from YAML files and environment variables.
 """
+import copy
+import logging
 import os
-import re
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 
+from .utils import validate_mac_address
+
+# Prefer the LibYAML-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+# Environment variable -> (section, key, converter) for Config.load_from_env
+_ENV_MAP = (
+    ("WEATHER_LOGGER_AMBIENT_WEATHER_API_KEY", "ambient_weather", "api_key", str),
+    ("WEATHER_LOGGER_AMBIENT_WEATHER_APPLICATION_KEY", "ambient_weather", "application_key", str),
+    ("WEATHER_LOGGER_AMBIENT_WEATHER_MAC_ADDRESS", "ambient_weather", "mac_address", str),
+    ("WEATHER_LOGGER_AMBIENT_WEATHER_POLL_INTERVAL", "ambient_weather", "poll_interval", int),
+    ("WEATHER_LOGGER_DATABASE_PATH", "database", "path", str),
+    ("WEATHER_LOGGER_LOGGING_LEVEL", "logging", "level", str),
+    ("WEATHER_LOGGER_LOGGING_FILE", "logging", "file", str),
+    ("WEATHER_LOGGER_LOGGING_FORMAT", "logging", "format", str),
+)
+
+# Defaults for the optional logging section
+_LOG_DEFAULTS = {
+    "level": "INFO",
+    "file": "logs/weather_logger.log",
+    "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+}
+
+# Parsed YAML files keyed by (resolved path, mtime in ns, size)
+_PARSE_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
 
 class ConfigError(Exception):
     """Raised when configuration is invalid or missing."""
@@ -48,18 +80,32 @@ class Config:
             raise ConfigError(f"Configuration file not found: {path}")
 
         try:
-            with open(config_path, 'r') as f:
-                config_dict = yaml.safe_load(f)
+            # Reuse the parsed file if it hasn't changed since it was last loaded
+            st = os.stat(config_path)
+            cache_key = (str(config_path.resolve()), st.st_mtime_ns, st.st_size)
+
+            if cache_key in _PARSE_CACHE:
+                return cls(copy.deepcopy(_PARSE_CACHE[cache_key]))
+
+            # Binary mode lets LibYAML decode the bytes itself
+            with open(config_path, 'rb') as f:
+                config_dict = yaml.load(f, Loader=_Loader)
 
             if config_dict is None:
                 raise ConfigError(f"Configuration file is empty: {path}")
 
+            _PARSE_CACHE[cache_key] = copy.deepcopy(config_dict)
             return cls(config_dict)
         except yaml.YAMLError as e:
             raise ConfigError(f"Failed to parse YAML configuration: {e}")
         except IOError as e:
             raise ConfigError(f"Failed to read configuration file: {e}")
 
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the cache of parsed configuration files."""
+        _PARSE_CACHE.clear()
+
     @classmethod
     def load_from_env(cls) -> "Config":
         """
@@ -81,27 +127,10 @@ class Config:
             "logging": {}
         }
 
-        # Ambient Weather settings
-        if api_key := os.getenv("WEATHER_LOGGER_AMBIENT_WEATHER_API_KEY"):
-            config_dict["ambient_weather"]["api_key"] = api_key
-        if app_key := os.getenv("WEATHER_LOGGER_AMBIENT_WEATHER_APPLICATION_KEY"):
-            config_dict["ambient_weather"]["application_key"] = app_key
-        if mac := os.getenv("WEATHER_LOGGER_AMBIENT_WEATHER_MAC_ADDRESS"):
-            config_dict["ambient_weather"]["mac_address"] = mac
-        if interval := os.getenv("WEATHER_LOGGER_AMBIENT_WEATHER_POLL_INTERVAL"):
-            config_dict["ambient_weather"]["poll_interval"] = int(interval)
-
-        # Database settings
-        if db_path := os.getenv("WEATHER_LOGGER_DATABASE_PATH"):
-            config_dict["database"]["path"] = db_path
-
-        # Logging settings
-        if log_level := os.getenv("WEATHER_LOGGER_LOGGING_LEVEL"):
-            config_dict["logging"]["level"] = log_level
-        if log_file := os.getenv("WEATHER_LOGGER_LOGGING_FILE"):
-            config_dict["logging"]["file"] = log_file
-        if log_format := os.getenv("WEATHER_LOGGER_LOGGING_FORMAT"):
-            config_dict["logging"]["format"] = log_format
+        env = os.environ
+        for env_var, section, key, convert in _ENV_MAP:
+            if value := env.get(env_var):
+                config_dict[section][key] = convert(value)
 
         return cls(config_dict)
 
@@ -150,6 +179,32 @@ class Config:
             if log_level.upper() not in valid_levels:
                 raise ConfigError(f"Invalid log level: {log_level}. Must be one of {valid_levels}")
 
+        # Materialize the section accessors once; configuration is immutable after validation
+        self._ambient = dict(self._config.get("ambient_weather", {}))
+        self._database = dict(self._config.get("database", {}))
+        self._logging = _LOG_DEFAULTS | self._config.get("logging", {})
+        self._logging_formatter: Optional[logging.Formatter] = None
+
+        # Flatten every key path (e.g. 'ambient_weather.api_key') for single-lookup get()
+        self._flat: Dict[str, Any] = {}
+        self._flatten("", self._config)
+
+    def _flatten(self, prefix: str, section: Dict[str, Any]) -> None:
+        """
+        Add every key path under a section to the flattened lookup table.
+
+        Intermediate sections are included so get() can return whole sections.
+
+        Args:
+            prefix: Dot-notation path of the section ('' for the root)
+            section: Configuration dictionary to flatten
+        """
+        for key, value in section.items():
+            path = f"{prefix}.{key}" if prefix else key
+            self._flat[path] = value
+            if isinstance(value, dict):
+                self._flatten(path, value)
+
     @staticmethod
     def _is_valid_mac_address(mac: str) -> bool:
         """
@@ -163,12 +218,7 @@ class Config:
         Returns:
             True if valid, False otherwise
         """
-        # Pattern with colons
-        pattern1 = re.compile(r'^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$')
-        # Pattern without colons
-        pattern2 = re.compile(r'^[0-9A-Fa-f]{12}$')
-
-        return bool(pattern1.match(mac) or pattern2.match(mac))
+        return validate_mac_address(mac)
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -181,34 +231,25 @@ class Config:
         Returns:
             Configuration value or default
         """
-        keys = key.split('.')
-        value = self._config
-
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-
-        return value
+        return self._flat.get(key, default)
 
     def get_ambient_weather_config(self) -> Dict[str, Any]:
         """Get ambient weather configuration section."""
-        return self._config.get("ambient_weather", {})
+        return self._ambient
 
     def get_database_config(self) -> Dict[str, Any]:
         """Get database configuration section."""
-        return self._config.get("database", {})
+        return self._database
 
     def get_logging_config(self) -> Dict[str, Any]:
         """Get logging configuration section with defaults."""
-        defaults = {
-            "level": "INFO",
-            "file": "logs/weather_logger.log",
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        }
-        config = self._config.get("logging", {})
-        return {**defaults, **config}
+        return self._logging
+
+    def get_logging_formatter(self) -> logging.Formatter:
+        """Get a logging formatter for the configured format (built once, then reused)."""
+        if self._logging_formatter is None:
+            self._logging_formatter = logging.Formatter(self._logging["format"])
+        return self._logging_formatter
 
     def to_dict(self, sanitize: bool = True) -> Dict[str, Any]:
         """
@@ -220,18 +261,17 @@ class Config:
         Returns:
             Configuration dictionary
         """
-        if not sanitize:
-            return self._config.copy()
-
-        # Create a sanitized copy
-        sanitized = self._config.copy()
+        # Copy each section one level deep so callers can edit the result
+        # without reaching the dicts behind get() and the section getters
+        exported = {
+            key: value.copy() if isinstance(value, dict) else value
+            for key, value in self._config.items()
+        }
 
-        if "ambient_weather" in sanitized:
-            ambient = sanitized["ambient_weather"].copy()
-            if "api_key" in ambient:
-                ambient["api_key"] = "***REDACTED***"
-            if "application_key" in ambient:
-                ambient["application_key"] = "***REDACTED***"
-            sanitized["ambient_weather"] = ambient
+        if sanitize and "ambient_weather" in exported:
+            ambient = exported["ambient_weather"]
+            for key in ("api_key", "application_key"):
+                if key in ambient:
+                    ambient[key] = "***REDACTED***"
 
-        return sanitized
+        return exported
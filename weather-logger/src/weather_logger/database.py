@@ -1,18 +1,59 @@
 """
 SQLite database operations for Weather Logger.
 """
+import itertools
 import logging
+import operator
+import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
+from dataclasses import fields
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from .models import WeatherMeasurement
 
 
 logger = logging.getLogger(__name__)
 
+# Shared by single and batch inserts so both reuse one cached prepared statement
+_INSERT_SQL = """
+    INSERT OR IGNORE INTO weather_measurements (
+        timestamp, temp_outdoor, temp_indoor, feels_like, dew_point,
+        humidity_outdoor, humidity_indoor,
+        pressure_relative, pressure_absolute,
+        wind_speed, wind_gust, wind_direction, wind_gust_direction, max_daily_gust,
+        hourly_rain, daily_rain, weekly_rain, monthly_rain, yearly_rain,
+        solar_radiation, uv_index,
+        mac_address
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# WeatherMeasurement field names; these are also the table's column names
+_MEASUREMENT_FIELDS = tuple(f.name for f in fields(WeatherMeasurement))
+
+# Column values of a measurement, in WeatherMeasurement field order (matches the INSERT column list)
+_measurement_values = operator.attrgetter(*_MEASUREMENT_FIELDS)
+
+# Columns selected in field order, so rows construct measurements positionally
+_SELECT_MEASUREMENT_COLUMNS = ", ".join(_MEASUREMENT_FIELDS)
+
+# Measurement range queries keyed by (has start_time, has end_time, has limit),
+# built once so each call reuses the same SQL string
+_MEASUREMENTS_SQL = {
+    (has_start, has_end, has_limit): (
+        f"SELECT {_SELECT_MEASUREMENT_COLUMNS} FROM weather_measurements"
+        " WHERE mac_address = ?"
+        + (" AND timestamp >= ?" if has_start else "")
+        + (" AND timestamp <= ?" if has_end else "")
+        + " ORDER BY timestamp DESC"
+        + (" LIMIT ?" if has_limit else "")
+    )
+    for has_start, has_end, has_limit in itertools.product((False, True), repeat=3)
+}
+
 
 class DatabaseError(Exception):
     """Base exception for database errors."""
@@ -26,6 +67,21 @@ class WeatherDatabase:
     Handles schema initialization, data insertion, and queries.
     """
 
+    # Bytes of the database file to memory-map for reads (256 MiB)
+    MMAP_SIZE = 256 * 1024 * 1024
+
+    # Page cache size in KiB (negative cache_size is KiB in SQLite; 64 MiB)
+    CACHE_SIZE_KIB = 64 * 1024
+
+    # WAL pages written before SQLite checkpoints automatically
+    WAL_AUTOCHECKPOINT = 1000
+
+    # Rows fetched per round trip when building measurements from a query
+    FETCH_BATCH_SIZE = 1000
+
+    # Idle query_only reader connections kept open for reuse
+    READER_POOL_SIZE = 4
+
     def __init__(self, db_path: str):
         """
         Initialize database connection.
@@ -39,12 +95,59 @@ class WeatherDatabase:
         db_dir = Path(db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
 
-        logger.info(f"Initialized database at {db_path}")
+        # One writer connection shared by all threads, opened on first use;
+        # the lock serializes writes through it
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+        # Reader connections, checked out per query; in WAL mode they run
+        # alongside the writer's open transaction
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=self.READER_POOL_SIZE)
+
+        logger.info("Initialized database at %s", db_path)
+
+    def _connect(self, reader: bool = False) -> sqlite3.Connection:
+        """
+        Open a connection and apply the per-connection settings.
+
+        Args:
+            reader: Open a query_only reader instead of the writer connection
+
+        Returns:
+            sqlite3.Connection instance
+        """
+        # Used from several threads, but only by one at a time: the writer
+        # under self._lock, a reader while it is checked out of the pool
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if reader:
+            # WAL mode is a property of the database file, set by the writer
+            conn.execute("PRAGMA query_only=1")
+        else:
+            # Enable WAL mode for better concurrent access
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            # Checkpoint the WAL at a fixed size
+            conn.execute(f"PRAGMA wal_autocheckpoint={self.WAL_AUTOCHECKPOINT}")
+        # Memory-map the database file and keep temp tables in memory
+        conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # Keep hot index pages resident
+        conn.execute(f"PRAGMA cache_size=-{self.CACHE_SIZE_KIB}")
+
+        # Use Row factory for dict-like access
+        conn.row_factory = sqlite3.Row
+
+        return conn
 
     @contextmanager
     def get_connection(self):
         """
-        Context manager for database connections.
+        Context manager for the writer connection.
+
+        The connection is opened once and shared; the block holds the writer
+        lock, and any transaction left open by a failed block is rolled back
+        before the error propagates.
 
         Yields:
             sqlite3.Connection instance
@@ -54,27 +157,69 @@ class WeatherDatabase:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM weather_measurements")
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
-            # Enable WAL mode for better concurrent access
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA foreign_keys=ON")
+        with self._lock:
+            conn = self._conn
+            try:
+                if conn is None:
+                    conn = self._conn = self._connect()
+
+                yield conn
+            except sqlite3.Error as e:
+                logger.error("Database connection error: %s", e)
+                if conn:
+                    conn.rollback()
+                raise DatabaseError(f"Database connection error: {e}")
+            except BaseException:
+                if conn:
+                    conn.rollback()
+                raise
+
+    @contextmanager
+    def _read_connection(self):
+        """
+        Check out a query_only reader connection for the duration of the block.
+
+        Readers never take the writer lock and see the last committed data.
 
-            # Use Row factory for dict-like access
-            conn.row_factory = sqlite3.Row
+        Yields:
+            sqlite3.Connection instance
+        """
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect(reader=True)
 
+        try:
             yield conn
         except sqlite3.Error as e:
-            logger.error(f"Database connection error: {e}")
-            if conn:
-                conn.rollback()
+            logger.error("Database connection error: %s", e)
             raise DatabaseError(f"Database connection error: {e}")
         finally:
-            if conn:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
                 conn.close()
 
+    def close(self) -> None:
+        """
+        Close the writer connection and the idle reader connections.
+
+        Readers checked out at the time are returned to the pool when their
+        query finishes. A later call that needs the database opens a new
+        connection.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                logger.debug("Closed database connection")
+
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
     def initialize_schema(self) -> None:
         """
         Initialize database schema.
@@ -137,22 +282,18 @@ class WeatherDatabase:
                 )
             """)
 
-            # Create indexes for efficient querying
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timestamp
-                ON weather_measurements(timestamp DESC)
-            """)
-
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_mac_address
-                ON weather_measurements(mac_address)
-            """)
-
+            # Create index for efficient device+time querying; it also serves
+            # mac_address-only lookups, and the UNIQUE(timestamp, mac_address)
+            # index serves timestamp-only ones
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_mac_timestamp
                 ON weather_measurements(mac_address, timestamp DESC)
             """)
 
+            # Drop the redundant single-column indexes older databases carry
+            cursor.execute("DROP INDEX IF EXISTS idx_timestamp")
+            cursor.execute("DROP INDEX IF EXISTS idx_mac_address")
+
             # Create devices metadata table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS devices (
@@ -185,6 +326,7 @@ class WeatherDatabase:
         Insert a weather measurement into the database.
 
         Uses INSERT OR IGNORE to skip duplicates based on (timestamp, mac_address).
+        Each call commits its own row; use insert_measurements_batch for bulk loads.
 
         Args:
             measurement: WeatherMeasurement instance
@@ -199,55 +341,27 @@ class WeatherDatabase:
             cursor = conn.cursor()
 
             try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO weather_measurements (
-                        timestamp, temp_outdoor, temp_indoor, feels_like, dew_point,
-                        humidity_outdoor, humidity_indoor,
-                        pressure_relative, pressure_absolute,
-                        wind_speed, wind_gust, wind_direction, wind_gust_direction, max_daily_gust,
-                        hourly_rain, daily_rain, weekly_rain, monthly_rain, yearly_rain,
-                        solar_radiation, uv_index,
-                        mac_address
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    measurement.timestamp,
-                    measurement.temp_outdoor,
-                    measurement.temp_indoor,
-                    measurement.feels_like,
-                    measurement.dew_point,
-                    measurement.humidity_outdoor,
-                    measurement.humidity_indoor,
-                    measurement.pressure_relative,
-                    measurement.pressure_absolute,
-                    measurement.wind_speed,
-                    measurement.wind_gust,
-                    measurement.wind_direction,
-                    measurement.wind_gust_direction,
-                    measurement.max_daily_gust,
-                    measurement.hourly_rain,
-                    measurement.daily_rain,
-                    measurement.weekly_rain,
-                    measurement.monthly_rain,
-                    measurement.yearly_rain,
-                    measurement.solar_radiation,
-                    measurement.uv_index,
-                    measurement.mac_address,
-                ))
+                cursor.execute(_INSERT_SQL, _measurement_values(measurement))
 
                 conn.commit()
 
-                if cursor.lastrowid > 0:
-                    logger.debug(f"Inserted measurement: {measurement.timestamp}")
+                # lastrowid is connection-wide and survives an ignored duplicate;
+                # rowcount is 0 when INSERT OR IGNORE skipped the row
+                if cursor.rowcount > 0:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Inserted measurement: %s", measurement.timestamp)
+
                     return cursor.lastrowid
                 else:
-                    logger.debug(f"Duplicate measurement skipped: {measurement.timestamp}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Duplicate measurement skipped: %s", measurement.timestamp)
                     return None
 
             except sqlite3.IntegrityError as e:
-                logger.warning(f"Integrity error inserting measurement: {e}")
+                logger.warning("Integrity error inserting measurement: %s", e)
                 return None
             except sqlite3.Error as e:
-                logger.error(f"Error inserting measurement: {e}")
+                logger.error("Error inserting measurement: %s", e)
                 raise DatabaseError(f"Failed to insert measurement: {e}")
 
     def insert_measurements_batch(self, measurements: List[WeatherMeasurement]) -> int:
@@ -266,60 +380,43 @@ class WeatherDatabase:
         if not measurements:
             return 0
 
-        inserted_count = 0
-
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
             try:
-                for measurement in measurements:
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO weather_measurements (
-                            timestamp, temp_outdoor, temp_indoor, feels_like, dew_point,
-                            humidity_outdoor, humidity_indoor,
-                            pressure_relative, pressure_absolute,
-                            wind_speed, wind_gust, wind_direction, wind_gust_direction, max_daily_gust,
-                            hourly_rain, daily_rain, weekly_rain, monthly_rain, yearly_rain,
-                            solar_radiation, uv_index,
-                            mac_address
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        measurement.timestamp,
-                        measurement.temp_outdoor,
-                        measurement.temp_indoor,
-                        measurement.feels_like,
-                        measurement.dew_point,
-                        measurement.humidity_outdoor,
-                        measurement.humidity_indoor,
-                        measurement.pressure_relative,
-                        measurement.pressure_absolute,
-                        measurement.wind_speed,
-                        measurement.wind_gust,
-                        measurement.wind_direction,
-                        measurement.wind_gust_direction,
-                        measurement.max_daily_gust,
-                        measurement.hourly_rain,
-                        measurement.daily_rain,
-                        measurement.weekly_rain,
-                        measurement.monthly_rain,
-                        measurement.yearly_rain,
-                        measurement.solar_radiation,
-                        measurement.uv_index,
-                        measurement.mac_address,
-                    ))
-
-                    if cursor.lastrowid > 0:
-                        inserted_count += 1
+                cursor.executemany(_INSERT_SQL, map(_measurement_values, measurements))
+
+                # Summed over the batch; INSERT OR IGNORE counts 0 for a skipped duplicate
+                inserted_count = cursor.rowcount
 
                 conn.commit()
-                logger.info(f"Batch inserted {inserted_count}/{len(measurements)} measurements")
+                logger.info("Batch inserted %s/%s measurements", inserted_count, len(measurements))
 
                 return inserted_count
 
             except sqlite3.Error as e:
-                logger.error(f"Error in batch insert: {e}")
+                logger.error("Error in batch insert: %s", e)
                 raise DatabaseError(f"Batch insert failed: {e}")
 
+    def optimize(self) -> None:
+        """
+        Refresh query planner statistics where SQLite judges them stale.
+
+        Cheap when nothing has changed; intended to be called periodically
+        by long-running processes.
+
+        Raises:
+            DatabaseError: If the optimize fails
+        """
+        with self.get_connection() as conn:
+            try:
+                conn.execute("PRAGMA optimize")
+                logger.debug("Ran PRAGMA optimize")
+
+            except sqlite3.Error as e:
+                logger.error("Error optimizing database: %s", e)
+                raise DatabaseError(f"Failed to optimize database: {e}")
+
     def get_latest_timestamp(self, mac_address: str) -> Optional[int]:
         """
         Get the timestamp of the most recent measurement for a device.
@@ -333,7 +430,7 @@ class WeatherDatabase:
         Raises:
             DatabaseError: If query fails
         """
-        with self.get_connection() as conn:
+        with self._read_connection() as conn:
             cursor = conn.cursor()
 
             try:
@@ -351,9 +448,90 @@ class WeatherDatabase:
                     return None
 
             except sqlite3.Error as e:
-                logger.error(f"Error getting latest timestamp: {e}")
+                logger.error("Error getting latest timestamp: %s", e)
                 raise DatabaseError(f"Failed to get latest timestamp: {e}")
 
+    @staticmethod
+    def _measurements_query(
+        mac_address: str,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        limit: Optional[int]
+    ) -> Tuple[str, List]:
+        """
+        Build the measurement range query shared by the row and column readers.
+
+        Args:
+            mac_address: Device MAC address
+            start_time: Start of time range as Unix epoch seconds (optional)
+            end_time: End of time range as Unix epoch seconds (optional)
+            limit: Maximum number of records to return (optional)
+
+        Returns:
+            Tuple of (SQL, parameters), selecting columns in field order
+        """
+        params = [mac_address]
+
+        if start_time:
+            params.append(start_time)
+
+        if end_time:
+            params.append(end_time)
+
+        if limit:
+            params.append(limit)
+
+        query = _MEASUREMENTS_SQL[bool(start_time), bool(end_time), bool(limit)]
+
+        return query, params
+
+    def iter_measurements(
+        self,
+        mac_address: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[WeatherMeasurement]:
+        """
+        Stream weather measurements for a device within a time range.
+
+        Rows are fetched in FETCH_BATCH_SIZE chunks, so memory stays flat for
+        large ranges. The iterator holds its own reader connection until it is
+        exhausted or closed, so writers are never blocked by it.
+
+        Args:
+            mac_address: Device MAC address
+            start_time: Start of time range as Unix epoch seconds (optional)
+            end_time: End of time range as Unix epoch seconds (optional)
+            limit: Maximum number of records to return (optional)
+
+        Yields:
+            WeatherMeasurement instances, ordered by timestamp descending
+
+        Raises:
+            DatabaseError: If query fails
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                query, params = self._measurements_query(mac_address, start_time, end_time, limit)
+
+                # Plain tuples in field order: skip sqlite3.Row and keyword construction
+                cursor.row_factory = None
+                cursor.execute(query, params)
+
+                while rows := cursor.fetchmany(self.FETCH_BATCH_SIZE):
+                    for row in rows:
+                        yield WeatherMeasurement(*row)
+
+            except sqlite3.Error as e:
+                logger.error("Error querying measurements: %s", e)
+                raise DatabaseError(f"Failed to query measurements: {e}")
+
+            finally:
+                cursor.close()
+
     def get_measurements(
         self,
         mac_address: str,
@@ -376,69 +554,55 @@ class WeatherDatabase:
         Raises:
             DatabaseError: If query fails
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        measurements = list(self.iter_measurements(mac_address, start_time, end_time, limit))
 
-            try:
-                # Build query dynamically based on parameters
-                query = """
-                    SELECT * FROM weather_measurements
-                    WHERE mac_address = ?
-                """
-                params = [mac_address]
+        logger.debug("Retrieved %s measurements", len(measurements))
+        return measurements
 
-                if start_time:
-                    query += " AND timestamp >= ?"
-                    params.append(start_time)
+    def get_measurement_columns(
+        self,
+        mac_address: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, tuple]:
+        """
+        Query weather measurements as columns rather than objects.
+
+        Cheaper than get_measurements for analytical callers (plots, aggregates)
+        since no WeatherMeasurement is built per row.
+
+        Args:
+            mac_address: Device MAC address
+            start_time: Start of time range as Unix epoch seconds (optional)
+            end_time: End of time range as Unix epoch seconds (optional)
+            limit: Maximum number of records to return (optional)
 
-                if end_time:
-                    query += " AND timestamp <= ?"
-                    params.append(end_time)
+        Returns:
+            Dictionary of field name to a tuple of values, ordered by timestamp descending
 
-                query += " ORDER BY timestamp DESC"
+        Raises:
+            DatabaseError: If query fails
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
 
-                if limit:
-                    query += " LIMIT ?"
-                    params.append(limit)
+            try:
+                query, params = self._measurements_query(mac_address, start_time, end_time, limit)
 
+                cursor.row_factory = None
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
 
-                # Convert rows to WeatherMeasurement objects
-                measurements = []
-                for row in rows:
-                    measurement = WeatherMeasurement(
-                        timestamp=row['timestamp'],
-                        temp_outdoor=row['temp_outdoor'],
-                        temp_indoor=row['temp_indoor'],
-                        feels_like=row['feels_like'],
-                        dew_point=row['dew_point'],
-                        humidity_outdoor=row['humidity_outdoor'],
-                        humidity_indoor=row['humidity_indoor'],
-                        pressure_relative=row['pressure_relative'],
-                        pressure_absolute=row['pressure_absolute'],
-                        wind_speed=row['wind_speed'],
-                        wind_gust=row['wind_gust'],
-                        wind_direction=row['wind_direction'],
-                        wind_gust_direction=row['wind_gust_direction'],
-                        max_daily_gust=row['max_daily_gust'],
-                        hourly_rain=row['hourly_rain'],
-                        daily_rain=row['daily_rain'],
-                        weekly_rain=row['weekly_rain'],
-                        monthly_rain=row['monthly_rain'],
-                        yearly_rain=row['yearly_rain'],
-                        solar_radiation=row['solar_radiation'],
-                        uv_index=row['uv_index'],
-                        mac_address=row['mac_address'],
-                    )
-                    measurements.append(measurement)
-
-                logger.debug(f"Retrieved {len(measurements)} measurements")
-                return measurements
+                # Transpose rows into one tuple per column
+                columns = zip(*rows) if rows else ((),) * len(_MEASUREMENT_FIELDS)
+
+                logger.debug("Retrieved %s measurements as columns", len(rows))
+                return dict(zip(_MEASUREMENT_FIELDS, columns))
 
             except sqlite3.Error as e:
-                logger.error(f"Error querying measurements: {e}")
-                raise DatabaseError(f"Failed to query measurements: {e}")
+                logger.error("Error querying measurement columns: %s", e)
+                raise DatabaseError(f"Failed to query measurement columns: {e}")
 
     def get_record_count(self, mac_address: Optional[str] = None) -> int:
         """
@@ -453,7 +617,7 @@ class WeatherDatabase:
         Raises:
             DatabaseError: If query fails
         """
-        with self.get_connection() as conn:
+        with self._read_connection() as conn:
             cursor = conn.cursor()
 
             try:
@@ -473,7 +637,7 @@ class WeatherDatabase:
                 return row['count'] if row else 0
 
             except sqlite3.Error as e:
-                logger.error(f"Error getting record count: {e}")
+                logger.error("Error getting record count: %s", e)
                 raise DatabaseError(f"Failed to get record count: {e}")
 
     def update_device_metadata(
@@ -498,17 +662,14 @@ class WeatherDatabase:
                     INSERT INTO devices (mac_address, device_name, location, last_seen)
                     VALUES (?, ?, ?, ?)
                     ON CONFLICT(mac_address) DO UPDATE SET
-                        device_name = COALESCE(?, device_name),
-                        location = COALESCE(?, location),
-                        last_seen = ?
-                """, (
-                    mac_address, device_name, location, datetime.now(),
-                    device_name, location, datetime.now()
-                ))
+                        device_name = COALESCE(excluded.device_name, device_name),
+                        location = COALESCE(excluded.location, location),
+                        last_seen = excluded.last_seen
+                """, (mac_address, device_name, location, datetime.now()))
 
                 conn.commit()
-                logger.debug(f"Updated metadata for device {mac_address}")
+                logger.debug("Updated metadata for device %s", mac_address)
 
             except sqlite3.Error as e:
-                logger.error(f"Error updating device metadata: {e}")
+                logger.error("Error updating device metadata: %s", e)
                 raise DatabaseError(f"Failed to update device metadata: {e}")
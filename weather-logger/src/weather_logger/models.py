@@ -7,7 +7,7 @@ from typing import Dict, Optional
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class WeatherMeasurement:
     """
     Represents a single weather measurement from an Ambient Weather station.
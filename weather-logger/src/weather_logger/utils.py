@@ -1,49 +1,94 @@
 """
 Utility functions for Weather Logger.
 """
+import atexit
 import logging
+import queue
+import re
 import time
 from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Callable, Tuple, Type
+from typing import Any, Callable, Optional, Tuple, Type
 
 
-def setup_logging(log_file: str, log_level: str = "INFO", log_format: str = None) -> None:
+# Background listener writing queued log records to the file and console handlers
+_log_listener: Optional[QueueListener] = None
+
+# Dictionary keys whose values sanitize_for_logging redacts (compared casefolded)
+_SENSITIVE_KEYS = frozenset({"api_key", "application_key", "password", "secret", "token"})
+
+# XX:XX:XX:XX:XX:XX or XXXXXXXXXXXX, matched with fullmatch
+_MAC_ADDRESS_RE = re.compile(r"[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}|[0-9A-Fa-f]{12}", re.ASCII)
+
+
+def setup_logging(
+    log_file: str,
+    log_level: str = "INFO",
+    log_format: str = None,
+    formatter: logging.Formatter = None,
+) -> None:
     """
     Setup logging configuration with file and console handlers.
 
+    Log calls only enqueue the record; a background listener thread does the
+    file and console writes.
+
     Args:
         log_file: Path to log file
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_format: Log message format string
+        formatter: Prebuilt formatter to use instead of log_format (optional)
     """
-    if log_format is None:
-        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    global _log_listener
+
+    if formatter is None:
+        if log_format is None:
+            log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        # One formatter shared by both handlers
+        formatter = logging.Formatter(log_format)
 
     # Create logs directory if it doesn't exist
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
+    level = getattr(logging, log_level.upper(), logging.INFO)
+
     # Configure root logger
     logger = logging.getLogger()
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    logger.setLevel(level)
 
     # Remove existing handlers
     logger.handlers.clear()
+    _stop_log_listener()
 
     # File handler
     file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-    file_formatter = logging.Formatter(log_format)
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(formatter)
 
     # Console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-    console_formatter = logging.Formatter(log_format)
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
+
+    # Route records through a queue so callers never block on I/O
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+
+    _log_listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+
+
+@atexit.register
+def _stop_log_listener() -> None:
+    """Drain queued log records and stop the listener thread, if running."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 
 def retry(
@@ -71,11 +116,20 @@ def retry(
         def fetch_data():
             return requests.get("https://api.example.com/data")
     """
+    # Delay after each failed attempt except the last, computed once
+    if exponential:
+        delays = [
+            min(base_delay * (2 ** (attempt - 1)), max_delay)
+            for attempt in range(1, max_attempts)
+        ]
+    else:
+        delays = [base_delay] * (max_attempts - 1)
+
     def decorator(func: Callable) -> Callable:
+        logger = logging.getLogger(func.__module__)
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            logger = logging.getLogger(func.__module__)
-
             for attempt in range(1, max_attempts + 1):
                 try:
                     return func(*args, **kwargs)
@@ -86,11 +140,7 @@ def retry(
                         )
                         raise
 
-                    # Calculate delay
-                    if exponential:
-                        delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
-                    else:
-                        delay = base_delay
+                    delay = delays[attempt - 1]
 
                     logger.warning(
                         f"{func.__name__} failed (attempt {attempt}/{max_attempts}), "
@@ -118,14 +168,12 @@ def validate_mac_address(mac: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    import re
+    # Only 12- and 17-character strings can match; reject the rest before the regex
+    length = len(mac)
+    if length != 12 and length != 17:
+        return False
 
-    # Pattern with colons
-    pattern1 = re.compile(r'^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$')
-    # Pattern without colons
-    pattern2 = re.compile(r'^[0-9A-Fa-f]{12}$')
-
-    return bool(pattern1.match(mac) or pattern2.match(mac))
+    return _MAC_ADDRESS_RE.fullmatch(mac) is not None
 
 
 def sanitize_for_logging(data: Any) -> Any:
@@ -140,15 +188,19 @@ def sanitize_for_logging(data: Any) -> Any:
     """
     if isinstance(data, dict):
         sanitized = {}
-        sensitive_keys = {"api_key", "application_key", "password", "secret", "token"}
-
-        for key, value in data.items():
-            if key.lower() in sensitive_keys:
-                sanitized[key] = "***REDACTED***"
-            elif isinstance(value, dict):
-                sanitized[key] = sanitize_for_logging(value)
-            else:
-                sanitized[key] = value
+
+        # Walk nested dicts with an explicit stack instead of recursing
+        stack = [(data, sanitized)]
+        while stack:
+            source, target = stack.pop()
+            for key, value in source.items():
+                if key.casefold() in _SENSITIVE_KEYS:
+                    target[key] = "***REDACTED***"
+                elif isinstance(value, dict):
+                    target[key] = nested = {}
+                    stack.append((value, nested))
+                else:
+                    target[key] = value
 
         return sanitized
     elif isinstance(data, str):
@@ -155,6 +155,7 @@ def test_database(config, measurement):
             new_count = db.get_record_count()
             print(f"✓ Total records in database: {new_count}")
 
+        db.close()
         return True
     except Exception as e:
         print(f"✗ Database error: {e}")
@@ -12,16 +12,23 @@ from weather_logger.api_client import (
 )
 
 
+@pytest.fixture(scope="module")
+def shared_client():
+    """Create a test client shared by all tests in the module."""
+    return AmbientWeatherClient(
+        api_key="test_api_key",
+        application_key="test_app_key"
+    )
+
+
 class TestAmbientWeatherClient:
     """Tests for AmbientWeatherClient class."""
 
     @pytest.fixture
-    def client(self):
-        """Create a test client."""
-        return AmbientWeatherClient(
-            api_key="test_api_key",
-            application_key="test_app_key"
-        )
+    def client(self, shared_client):
+        """Provide the shared client with fresh rate limiting state."""
+        shared_client.reset()
+        return shared_client
 
     @patch('weather_logger.api_client.requests.Session.get')
     def test_get_devices_success(self, mock_get, client):
@@ -99,17 +106,61 @@ class TestAmbientWeatherClient:
         assert measurement.humidity_outdoor == 50
         assert measurement.mac_address == "AA:BB:CC:DD:EE:FF"
 
+    @patch('weather_logger.api_client.requests.Session.get')
+    def test_get_recent_measurements(self, mock_get, client):
+        """Test converting a batch of records to measurements."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [
+            {"dateutc": 1640000300000, "tempf": 73.0},
+            {"dateutc": 1640000000000, "tempf": 72.5}
+        ]
+        mock_get.return_value = mock_response
+
+        measurements = client.get_recent_measurements("AA:BB:CC:DD:EE:FF", limit=2)
+
+        assert [m.timestamp for m in measurements] == [1640000300, 1640000000]
+        assert [m.temp_outdoor for m in measurements] == [73.0, 72.5]
+        assert all(m.mac_address == "AA:BB:CC:DD:EE:FF" for m in measurements)
+
+    @patch('weather_logger.api_client.requests.Session.get')
+    def test_auth_params_not_added_per_request(self, mock_get, client):
+        """Test that auth keys come from the session rather than per-request params."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = []
+        mock_get.return_value = mock_response
+
+        client.get_device_data("AA:BB:CC:DD:EE:FF", limit=5)
+
+        assert client.session.params == {
+            "applicationKey": "test_app_key",
+            "apiKey": "test_api_key"
+        }
+        assert mock_get.call_args.kwargs["params"] == {"limit": 5}
+
+    def test_adapter_retries_respect_rate_limit(self, client):
+        """Test that adapter retries skip 429 and never come sooner than the rate limit."""
+        retry = client.session.get_adapter(client.BASE_URL).max_retries
+
+        assert 429 not in retry.status_forcelist
+        assert retry.total <= 2
+
+        # urllib3 would retry the first failure with no delay
+        first_retry = retry.increment("GET", "/devices", response=Mock(status=503, headers={}))
+        assert first_retry.get_backoff_time() >= 1.0
+
     def test_rate_limiting(self, client):
         """Test that rate limiting enforces 1 second delay."""
         import time
 
         # Set last request time to now
-        client._last_request_time = time.time()
+        client._last_request_time = time.monotonic()
 
         # Enforce rate limit should sleep
-        start = time.time()
+        start = time.monotonic()
         client._enforce_rate_limit()
-        elapsed = time.time() - start
+        elapsed = time.monotonic() - start
 
         # Should have slept for approximately 1 second
         assert elapsed >= 0.9  # Allow some tolerance
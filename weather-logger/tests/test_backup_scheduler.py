@@ -0,0 +1,62 @@
+"""
+Tests for backup scheduler.
+"""
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# backup_scheduler.py is a script next to src/, not part of the package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backup_scheduler import BackupScheduler
+from weather_logger.config import Config
+
+
+@pytest.fixture
+def los_angeles_tz(monkeypatch):
+    """Run the test with a non-UTC local timezone."""
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def make_scheduler(schedule: str) -> BackupScheduler:
+    """Create a scheduler with backups disabled (no S3 client needed)."""
+    return BackupScheduler(Config({
+        "ambient_weather": {
+            "api_key": "test_api_key",
+            "application_key": "test_app_key",
+            "mac_address": "AA:BB:CC:DD:EE:FF"
+        },
+        "database": {"path": "data/weather.db"},
+        "backup": {"enabled": False, "schedule": schedule}
+    }))
+
+
+class TestBackupScheduler:
+    """Tests for BackupScheduler class."""
+
+    def test_cron_schedule_uses_local_time(self, los_angeles_tz):
+        """Test that a non-daily cron schedule is evaluated in local time."""
+        scheduler = make_scheduler("0 2 * * 1")  # Mondays at 2am
+
+        # Wednesday 2026-10-28 12:00 local; the next Monday crosses the DST change
+        now = datetime(2026, 10, 28, 12, 0).timestamp()
+        backup_at = time.localtime(now + scheduler._time_until_next_backup(now))
+
+        assert (backup_at.tm_wday, backup_at.tm_hour, backup_at.tm_min) == (0, 2, 0)
+        assert backup_at.tm_mday == 2
+
+    def test_daily_schedule_uses_local_time(self, los_angeles_tz):
+        """Test that a daily schedule is evaluated in local time."""
+        scheduler = make_scheduler("30 3 * * *")
+
+        now = datetime(2026, 10, 28, 12, 0).timestamp()
+        backup_at = time.localtime(now + scheduler._time_until_next_backup(now))
+
+        assert (backup_at.tm_mday, backup_at.tm_hour, backup_at.tm_min) == (29, 3, 30)
@@ -3,6 +3,7 @@ Tests for config module.
 """
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 from weather_logger.config import Config, ConfigError
 
 
@@ -35,11 +36,52 @@ logging:
         assert config.get("ambient_weather.mac_address") == "AA:BB:CC:DD:EE:FF"
         assert config.get("database.path") == "data/weather.db"
 
+    def test_load_from_file_uses_cache(self, tmp_path):
+        """Test that unchanged files are served from the parse cache."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("""
+ambient_weather:
+  api_key: "test_api_key"
+  application_key: "test_app_key"
+  mac_address: "AA:BB:CC:DD:EE:FF"
+
+database:
+  path: "data/weather.db"
+        """)
+
+        Config.clear_cache()
+        Config.load_from_file(str(config_file))
+
+        with patch("weather_logger.config.yaml.load") as mock_load:
+            config = Config.load_from_file(str(config_file))
+            mock_load.assert_not_called()
+
+        assert config.get("database.path") == "data/weather.db"
+
+        # Modifying the file invalidates the cached entry
+        config_file.write_text(config_file.read_text().replace("data/weather.db", "data/other.db"))
+        config = Config.load_from_file(str(config_file))
+        assert config.get("database.path") == "data/other.db"
+
     def test_load_from_missing_file(self):
         """Test that loading from a missing file raises ConfigError."""
         with pytest.raises(ConfigError, match="Configuration file not found"):
             Config.load_from_file("nonexistent.yaml")
 
+    def test_load_from_env(self, monkeypatch):
+        """Test loading configuration from environment variables."""
+        monkeypatch.setenv("WEATHER_LOGGER_AMBIENT_WEATHER_API_KEY", "test_api_key")
+        monkeypatch.setenv("WEATHER_LOGGER_AMBIENT_WEATHER_APPLICATION_KEY", "test_app_key")
+        monkeypatch.setenv("WEATHER_LOGGER_AMBIENT_WEATHER_MAC_ADDRESS", "AA:BB:CC:DD:EE:FF")
+        monkeypatch.setenv("WEATHER_LOGGER_AMBIENT_WEATHER_POLL_INTERVAL", "120")
+        monkeypatch.setenv("WEATHER_LOGGER_DATABASE_PATH", "data/env.db")
+
+        config = Config.load_from_env()
+
+        assert config.get("ambient_weather.api_key") == "test_api_key"
+        assert config.get("ambient_weather.poll_interval") == 120
+        assert config.get("database.path") == "data/env.db"
+
     def test_validation_missing_api_key(self):
         """Test validation fails when API key is missing."""
         config_dict = {
@@ -67,6 +109,19 @@ logging:
         with pytest.raises(ConfigError, match="Invalid MAC address"):
             Config(config_dict)
 
+    @pytest.mark.parametrize("mac,expected", [
+        ("AA:BB:CC:DD:EE:FF", True),
+        ("aabbccddeeff", True),
+        ("AA:BB:CC:DD:EE:F", False),
+        ("AA-BB-CC-DD-EE-FF", False),
+        ("AABBCCDDEEFG", False),
+        ("AA:BB:CC:DD:EE:FF\n", False),
+        ("", False),
+    ])
+    def test_is_valid_mac_address(self, mac, expected):
+        """Test MAC address format validation."""
+        assert Config._is_valid_mac_address(mac) is expected
+
     def test_validation_invalid_poll_interval(self):
         """Test validation fails with poll interval < 60."""
         config_dict = {
@@ -113,3 +168,22 @@ logging:
         assert sanitized["ambient_weather"]["api_key"] == "***REDACTED***"
         assert sanitized["ambient_weather"]["application_key"] == "***REDACTED***"
         assert sanitized["ambient_weather"]["mac_address"] == "AA:BB:CC:DD:EE:FF"
+
+    def test_to_dict_copies_sections(self):
+        """Test that editing the exported dict leaves the config unchanged."""
+        config_dict = {
+            "ambient_weather": {
+                "api_key": "test_api_key",
+                "application_key": "test_app_key",
+                "mac_address": "AA:BB:CC:DD:EE:FF"
+            },
+            "database": {"path": "data/weather.db"}
+        }
+
+        config = Config(config_dict)
+        exported = config.to_dict(sanitize=False)
+        exported["database"]["path"] = "data/other.db"
+
+        assert exported["ambient_weather"]["api_key"] == "test_api_key"
+        assert config.get("database.path") == "data/weather.db"
+        assert config.to_dict(sanitize=False)["database"]["path"] == "data/weather.db"
@@ -2,22 +2,41 @@
 Tests for database module.
 """
 import pytest
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 from weather_logger.database import WeatherDatabase, DatabaseError
 from weather_logger.models import WeatherMeasurement
 
 
+@pytest.fixture(scope="session")
+def template_db_path(tmp_path_factory):
+    """Create a database with the schema initialized once for the whole session."""
+    db_path = tmp_path_factory.mktemp("template") / "template_weather.db"
+    WeatherDatabase(str(db_path)).initialize_schema()
+    return db_path
+
+
 class TestWeatherDatabase:
     """Tests for WeatherDatabase class."""
 
     @pytest.fixture
-    def db(self, tmp_path):
-        """Create a test database."""
+    def db(self, tmp_path, template_db_path):
+        """Create a test database by copying the schema template."""
         db_path = tmp_path / "test_weather.db"
+
+        source = sqlite3.connect(template_db_path)
+        target = sqlite3.connect(db_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
         database = WeatherDatabase(str(db_path))
-        database.initialize_schema()
-        return database
+        yield database
+        database.close()
 
     @pytest.fixture
     def sample_measurement(self):
@@ -62,6 +81,59 @@ class TestWeatherDatabase:
         count = db.get_record_count()
         assert count == 1
 
+    def test_insert_measurement_commits(self, db, sample_measurement):
+        """Test that a single insert is visible to other connections immediately."""
+        db.insert_measurement(sample_measurement)
+
+        other = sqlite3.connect(db.db_path)
+        try:
+            count_sql = "SELECT COUNT(*) FROM weather_measurements"
+            assert other.execute(count_sql).fetchone()[0] == 1
+        finally:
+            other.close()
+
+    def test_connection_shared_across_threads(self, db, sample_measurement):
+        """Test that inserts from other threads reuse the one connection."""
+        with db.get_connection() as conn:
+            main_conn = conn
+
+        worker = threading.Thread(target=db.insert_measurement, args=(sample_measurement,))
+        worker.start()
+        worker.join()
+
+        with db.get_connection() as conn:
+            assert conn is main_conn
+        assert db.get_record_count() == 1
+
+        # Closing drops the connection; the next call opens a fresh one
+        db.close()
+        with db.get_connection() as conn:
+            assert conn is not main_conn
+        assert db.get_record_count() == 1
+
+    def test_reads_do_not_wait_for_writer(self, db, sample_measurement):
+        """Test that reads run on reader connections alongside an open write transaction."""
+        db.insert_measurement(sample_measurement)
+
+        with db.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO weather_measurements (timestamp, mac_address) VALUES (?, ?)",
+                (1704114000, "AA:BB:CC:DD:EE:FF")
+            )
+
+            # Another thread can read while this thread holds the writer lock,
+            # and only sees committed rows
+            counts = []
+            reader = threading.Thread(target=lambda: counts.append(db.get_record_count()))
+            reader.start()
+            reader.join(timeout=5)
+
+            assert not reader.is_alive()
+            assert counts == [1]
+            conn.commit()
+
+        assert db.get_record_count() == 2
+
     def test_insert_duplicate_measurement(self, db, sample_measurement):
         """Test that duplicate measurements are ignored."""
         # Insert first time
@@ -102,6 +174,44 @@ class TestWeatherDatabase:
         assert measurements[0].temp_outdoor == 72.5
         assert measurements[0].humidity_outdoor == 50
 
+    def test_iter_measurements(self, db, sample_measurement):
+        """Test streaming measurements and abandoning the iterator early."""
+        db.insert_measurements_batch([
+            WeatherMeasurement(
+                timestamp=1704110460 + (i * 60),  # 2024-01-01 12:01:00 UTC + i minutes
+                temp_outdoor=70.0 + i,
+                mac_address="AA:BB:CC:DD:EE:FF"
+            )
+            for i in range(3)
+        ])
+
+        db.insert_measurement(sample_measurement)
+        iterator = db.iter_measurements("AA:BB:CC:DD:EE:FF")
+        assert next(iterator).timestamp == 1704110580
+        iterator.close()
+
+        assert db.get_record_count() == 4
+
+    def test_get_measurement_columns(self, db):
+        """Test querying measurements as columns."""
+        db.insert_measurements_batch([
+            WeatherMeasurement(
+                timestamp=1704110400 + (i * 60),  # 2024-01-01 12:00:00 UTC + i minutes
+                temp_outdoor=70.0 + i,
+                mac_address="AA:BB:CC:DD:EE:FF"
+            )
+            for i in range(3)
+        ])
+
+        columns = db.get_measurement_columns("AA:BB:CC:DD:EE:FF", limit=2)
+
+        assert columns["timestamp"] == (1704110520, 1704110460)
+        assert columns["temp_outdoor"] == (72.0, 71.0)
+        assert columns["humidity_outdoor"] == (None, None)
+
+        empty = db.get_measurement_columns("11:22:33:44:55:66")
+        assert empty["timestamp"] == ()
+
     def test_get_measurements_with_time_range(self, db):
         """Test querying measurements with time range."""
         # Insert measurements at different times
@@ -156,6 +266,24 @@ class TestWeatherDatabase:
         total = db.get_record_count()
         assert total == 5
 
+    def test_batch_insert_skips_duplicates(self, db, sample_measurement):
+        """Test that batch insert counts only newly inserted measurements."""
+        db.insert_measurement(sample_measurement)
+
+        measurements = [
+            sample_measurement,
+            WeatherMeasurement(
+                timestamp=sample_measurement.timestamp + 60,
+                temp_outdoor=71.0,
+                mac_address=sample_measurement.mac_address
+            )
+        ]
+
+        count = db.insert_measurements_batch(measurements)
+
+        assert count == 1
+        assert db.get_record_count() == 2
+
     def test_get_record_count_by_mac(self, db):
         """Test getting record count filtered by MAC address."""
         # Insert measurements for two different devices
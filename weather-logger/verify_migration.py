@@ -18,10 +18,12 @@ Usage:
 
 import argparse
 import logging
+import re
 import sqlite3
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +37,25 @@ logger = logging.getLogger(__name__)
 EPOCH_MIN = 1577836800  # 2020-01-01 00:00:00 UTC
 EPOCH_MAX = 1924992000  # 2030-12-31 00:00:00 UTC
 
+# Table-level UNIQUE constraint as written in the CREATE TABLE statement
+UNIQUE_CONSTRAINT_RE = re.compile(r"UNIQUE\s*\(\s*timestamp\s*,\s*mac_address\s*\)", re.IGNORECASE)
+
+# (record count, NULL timestamp count, min timestamp, max timestamp,
+#  count before EPOCH_MIN, count after EPOCH_MAX)
+TimestampStats = Tuple[int, int, Optional[int], Optional[int], int, int]
+
+
+class IsoTimestamp:
+    """Epoch timestamp rendered as ISO 8601 only when a log record is formatted."""
+
+    __slots__ = ("timestamp",)
+
+    def __init__(self, timestamp: int):
+        self.timestamp = timestamp
+
+    def __str__(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+
 
 def check_schema_version(conn: sqlite3.Connection) -> bool:
     """Verify schema version is 2."""
@@ -80,18 +101,36 @@ def check_timestamp_column_type(conn: sqlite3.Connection) -> bool:
         return False
 
 
-def check_null_timestamps(conn: sqlite3.Connection) -> bool:
-    """Verify there are no NULL timestamps."""
-    logger.info("Checking for NULL timestamps...")
+def get_timestamp_stats(conn: sqlite3.Connection) -> TimestampStats:
+    """
+    Scan weather_measurements once for the figures the data checks need.
+
+    Returns:
+        Tuple of (record count, NULL timestamp count, min timestamp, max timestamp,
+        count before EPOCH_MIN, count after EPOCH_MAX)
+    """
     cursor = conn.cursor()
 
     cursor.execute("""
-        SELECT COUNT(*) as null_count
+        SELECT
+            COUNT(*) as count,
+            SUM(CASE WHEN timestamp IS NULL THEN 1 ELSE 0 END) as null_count,
+            MIN(timestamp) as min_ts,
+            MAX(timestamp) as max_ts,
+            SUM(timestamp < :lo) as too_old,
+            SUM(timestamp > :hi) as too_new
         FROM weather_measurements
-        WHERE timestamp IS NULL
-    """)
-    row = cursor.fetchone()
-    null_count = row[0] if row else 0
+    """, {"lo": EPOCH_MIN, "hi": EPOCH_MAX})
+    count, null_count, min_ts, max_ts, too_old, too_new = cursor.fetchone()
+
+    # SUM() over no rows is NULL
+    return count, null_count or 0, min_ts, max_ts, too_old or 0, too_new or 0
+
+
+def check_null_timestamps(stats: TimestampStats) -> bool:
+    """Verify there are no NULL timestamps."""
+    logger.info("Checking for NULL timestamps...")
+    null_count = stats[1]
 
     if null_count == 0:
         logger.info(f"✓ No NULL timestamps found")
@@ -101,49 +140,27 @@ def check_null_timestamps(conn: sqlite3.Connection) -> bool:
         return False
 
 
-def check_timestamp_range(conn: sqlite3.Connection) -> bool:
+def check_timestamp_range(stats: TimestampStats) -> bool:
     """Verify timestamp values are in reasonable range."""
     logger.info("Checking timestamp value ranges...")
-    cursor = conn.cursor()
+    count, _, min_ts, max_ts, too_old, too_new = stats
 
-    cursor.execute("""
-        SELECT
-            MIN(timestamp) as min_ts,
-            MAX(timestamp) as max_ts,
-            COUNT(*) as count
-        FROM weather_measurements
-    """)
-    row = cursor.fetchone()
-
-    if not row or row[2] == 0:
+    if count == 0:
         logger.warning("⚠ No records found in database")
         return True
 
-    min_ts = row[0]
-    max_ts = row[1]
-    count = row[2]
-
-    issues = []
-
-    # Check minimum timestamp
-    if min_ts < EPOCH_MIN:
-        min_date = datetime.fromtimestamp(min_ts).isoformat()
-        issues.append(f"Minimum timestamp {min_ts} ({min_date}) is before 2020")
-
-    # Check maximum timestamp
-    if max_ts > EPOCH_MAX:
-        max_date = datetime.fromtimestamp(max_ts).isoformat()
-        issues.append(f"Maximum timestamp {max_ts} ({max_date}) is after 2030")
-
-    if issues:
-        logger.error(f"✗ Timestamp range issues found:")
-        for issue in issues:
-            logger.error(f"  - {issue}")
+    if too_old or too_new:
+        logger.error("✗ Timestamp range issues found:")
+        if too_old:
+            logger.error("  - %s timestamps are before 2020 (minimum %s, %s)", too_old, min_ts, IsoTimestamp(min_ts))
+        if too_new:
+            logger.error("  - %s timestamps are after 2030 (maximum %s, %s)", too_new, max_ts, IsoTimestamp(max_ts))
         return False
     else:
-        min_date = datetime.fromtimestamp(min_ts).isoformat()
-        max_date = datetime.fromtimestamp(max_ts).isoformat()
-        logger.info(f"✓ Timestamp range is valid: {min_ts} ({min_date}) to {max_ts} ({max_date})")
+        logger.info(
+            "✓ Timestamp range is valid: %s (%s) to %s (%s)",
+            min_ts, IsoTimestamp(min_ts), max_ts, IsoTimestamp(max_ts)
+        )
         logger.info(f"  Total records: {count}")
         return True
 
@@ -160,8 +177,6 @@ def check_indexes(conn: sqlite3.Connection) -> bool:
     indexes = {row[0] for row in cursor.fetchall()}
 
     required_indexes = {
-        'idx_timestamp',
-        'idx_mac_address',
         'idx_mac_timestamp'
     }
 
@@ -193,46 +208,31 @@ def check_unique_constraint(conn: sqlite3.Connection) -> bool:
     table_sql = row[0]
 
     # Check for UNIQUE constraint in table definition
-    if 'UNIQUE' in table_sql.upper() and 'TIMESTAMP' in table_sql.upper():
+    if UNIQUE_CONSTRAINT_RE.search(table_sql):
         logger.info("✓ UNIQUE constraint on (timestamp, mac_address) found in table definition")
 
-        # Also test that constraint is enforced
-        cursor.execute("SELECT timestamp, mac_address FROM weather_measurements LIMIT 1")
-        row = cursor.fetchone()
-
-        if row:
-            test_ts = row[0]
-            test_mac = row[1]
-
-            try:
-                # Try to insert duplicate
-                cursor.execute("""
-                    INSERT INTO weather_measurements (timestamp, mac_address, temp_outdoor)
-                    VALUES (?, ?, 99.9)
-                """, (test_ts, test_mac))
-                conn.rollback()
-                logger.error("✗ UNIQUE constraint not enforced (duplicate insert succeeded)")
-                return False
-            except sqlite3.IntegrityError:
-                conn.rollback()
-                logger.info("✓ UNIQUE constraint is enforced (duplicate insert rejected)")
+        # SQLite enforces a UNIQUE constraint through an automatic unique index;
+        # checking for it works on a read-only connection, unlike a test insert
+        cursor.execute("PRAGMA index_list(weather_measurements)")
+        unique_indexes = [row[1] for row in cursor.fetchall() if row[2] and row[3] == 'u']
+
+        for index_name in unique_indexes:
+            cursor.execute(f"PRAGMA index_info({index_name})")
+            if {row[2] for row in cursor.fetchall()} == {'timestamp', 'mac_address'}:
+                logger.info(f"✓ UNIQUE constraint is enforced by index {index_name}")
                 return True
-        else:
-            logger.info("✓ UNIQUE constraint definition found (no data to test enforcement)")
-            return True
+
+        logger.error("✗ UNIQUE constraint not enforced (no unique index on timestamp, mac_address)")
+        return False
     else:
         logger.error("✗ UNIQUE constraint on (timestamp, mac_address) not found")
         return False
 
 
-def check_record_count(conn: sqlite3.Connection) -> bool:
+def check_record_count(stats: TimestampStats) -> bool:
     """Verify record count is reasonable (> 0 if database is used)."""
     logger.info("Checking record count...")
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT COUNT(*) as count FROM weather_measurements")
-    row = cursor.fetchone()
-    count = row[0] if row else 0
+    count = stats[0]
 
     if count >= 0:
         logger.info(f"✓ Record count: {count}")
@@ -243,6 +243,28 @@ def check_record_count(conn: sqlite3.Connection) -> bool:
         return False
 
 
+def run_checks(conn: sqlite3.Connection) -> Iterator[bool]:
+    """
+    Run the verification checks lazily, cheap catalogue checks first.
+
+    The table scan behind the NULL, range and count checks only runs once
+    every metadata check has passed.
+
+    Yields:
+        Result of each check in turn
+    """
+    yield check_schema_version(conn)
+    yield check_timestamp_column_type(conn)
+    yield check_indexes(conn)
+    yield check_unique_constraint(conn)
+
+    # One table scan shared by the NULL, range and count checks
+    stats = get_timestamp_stats(conn)
+    yield check_null_timestamps(stats)
+    yield check_timestamp_range(stats)
+    yield check_record_count(stats)
+
+
 def verify_migration(db_path: str) -> bool:
     """
     Verify database migration was successful.
@@ -258,27 +280,21 @@ def verify_migration(db_path: str) -> bool:
         return False
 
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        # Read-only: never takes a write lock, so it is safe next to a running logger
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
 
         logger.info(f"Verifying database: {db_path}")
         logger.info("")
 
-        # Run all checks
-        checks = [
-            check_schema_version(conn),
-            check_timestamp_column_type(conn),
-            check_null_timestamps(conn),
-            check_timestamp_range(conn),
-            check_indexes(conn),
-            check_unique_constraint(conn),
-            check_record_count(conn),
-        ]
+        # Stops at the first failing check
+        passed = all(run_checks(conn))
 
         conn.close()
 
-        # Return True only if all checks passed
-        return all(checks)
+        return passed
 
     except sqlite3.Error as e:
         logger.error(f"Database error: {e}")